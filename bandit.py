@@ -0,0 +1,64 @@
+"""
+Bandit scoring
+--------------
+
+Treats each deck as an arm of a bandit whose win rate has a Beta posterior,
+and hands out games by Thompson sampling: every round, the posteriors are
+sampled many times, and only decks that came out best in some sample get
+more games. Scoring stops once one deck is the best with the requested
+confidence, or no deck that could still be the best has games left to
+play. Decks that are plainly worse stop after a round or two, so the games
+go to telling apart the decks that matter.
+"""
+
+import numpy
+
+def bestChances(results: list, draws: int, rng) -> numpy.ndarray:
+    """Returns the chance each `(won, played)` result is the best win rate,
+    from `draws` samples of the Beta posteriors under a uniform prior."""
+    won = numpy.array([r[0] for r in results], float)
+    lost = numpy.array([r[1] for r in results], float) - won
+    samples = rng.beta(won[:, None] + 1, lost[:, None] + 1, (len(results), draws))
+    return numpy.bincount(samples.argmax(0), minlength = len(results)) / draws
+
+def banditDecks(decks: list, contenders: list, wins: dict, play, games = 1000, roundGames = 100, confidence = 0.95, draws = 1000, seed = None, done = None) -> int:
+    """Scores `decks` into `wins` by Thompson sampling, and returns how many games were played.
+
+    Each round, every deck that still has a chance of being the best among
+    `decks` and `contenders` plays `roundGames` more games through `play(decks, games, start)`,
+    which returns each deck's outcomes for the games numbered from `start`.
+    `contenders` may include decks already scored in `wins`, which then
+    compete without playing. No deck plays more than `games` games, so this
+    never plays more than scoring every deck in full. A deck that was best in
+    none of the samples stops playing for good.
+    Stops once one deck is the best with chance `confidence`, estimated from
+    `draws` posterior samples drawn from a stream seeded by `seed`.
+
+    `done(deck)` is called as each deck stops playing, with its final score in `wins`."""
+
+    rng = numpy.random.default_rng(seed)
+    for deck in decks:
+        wins[deck] = (0, 0)
+    arms = list(dict.fromkeys(list(decks) + [deck for deck in contenders if deck in wins]))
+    arm = {deck: i for i, deck in enumerate(arms)}
+
+    racing = list(decks)
+    played = 0
+    while len(racing) > 0:
+        start = wins[racing[0]][1]
+        n = min(roundGames, games - start)
+        for deck, won in play(racing, n, start).items():
+            wins[deck] = (wins[deck][0] + sum(won), wins[deck][1] + n)
+        played += n * len(racing)
+
+        chances = bestChances([wins[deck] for deck in arms], draws, rng)
+        left = []
+        if chances.max() < confidence:
+            left = [deck for deck in racing if chances[arm[deck]] > 0 and wins[deck][1] < games]
+        if done is not None:
+            for deck in racing:
+                if deck not in left:
+                    done(deck)
+        racing = left
+
+    return played
@@ -0,0 +1,167 @@
+"""
+Benchmarks
+----------
+
+Times the simulator's hot paths on fixed decks (`default` and `deckBase`)
+with fixed seeds, so runs on the same machine can be compared: setting up a
+game, dealing the opening hand, the first turns, `go`, `nearbyDecks` and a
+whole `testDecks` iteration. Each is reported as calls per second and as the
+bytes allocated per call, measured under `tracemalloc` in a separate,
+shorter pass so tracing does not slow the timings down.
+
+Results are compared against a baseline file holding one set of results
+per engine, and anything slower or allocating more than `--tolerance`
+allows is flagged, with exit status 1.
+
+    python bench.py [-e ENGINE] [--save] [--quick]
+"""
+
+import argparse, json, os, sys, time, tracemalloc
+
+from main import game, default, deckBase, deckOptions, deckCounts, nearbyDecks, testDecks
+from shuffles import shuffleSource
+
+decks = {"default": default, "deckBase": deckBase}
+
+def measure(f, traced = False) -> tuple:
+    """Calls `f` and returns its result and the seconds it took, or with
+    `traced` the most bytes it had allocated at once."""
+    if traced:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = f()
+        return result, tracemalloc.get_traced_memory()[1] - before
+    start = time.perf_counter()
+    result = f()
+    return result, time.perf_counter() - start
+
+def benchGames(engine, deck: list, games: int, seed: int, traced = False) -> dict:
+    """Plays `games` seeded games of `deck` and returns the `(calls, cost)` of
+    setting each up (`init`, which deals the hand), dealing the hand again
+    (`mulligan`), `firstTurns` and `go`.
+
+    The hand is dealt again from a fresh copy of game k's stream, into a
+    full library and empty zones, so game k is still the game played. Batch
+    engines play all the games as one call and are not dealt again."""
+    costs = {}
+    def add(phase, cost, calls = 1):
+        n, total = costs.get(phase, (0, 0))
+        costs[phase] = (n + calls, total + cost)
+
+    if getattr(engine, "batch", False):
+        t, cost = measure(lambda: engine(deck, games, [seed, 0]), traced)
+        add("init", cost, games)
+        for phase in ["firstTurns", "go"]:
+            add(phase, measure(getattr(t, phase), traced)[1], games)
+        return costs
+
+    source = shuffleSource(seed, max(64, len(deck)))
+    for k in range(0, games):
+        t, cost = measure(lambda: engine(deck, rng = source.game(k)), traced)
+        add("init", cost)
+        t.library[:] = deck
+        t.clearZones()
+        t.rng = source.game(k)
+        for phase in ["mulligan", "firstTurns", "go"]:
+            add(phase, measure(getattr(t, phase), traced)[1])
+    return costs
+
+def benchNearby(deck: list, calls: int, traced = False) -> tuple:
+    """Returns the `(calls, cost)` of `calls` calls of `nearbyDecks` on `deck`."""
+    counts = deckCounts(deck)
+    total = 0
+    for _ in range(0, calls):
+        total += measure(lambda: nearbyDecks(counts, deckOptions), traced)[1]
+    return calls, total
+
+def benchIteration(engine, seed: int) -> tuple:
+    """Returns the `(games, seconds)` of one `testDecks` iteration from `default`."""
+    variations = nearbyDecks(deckCounts(default), deckOptions)
+    _, seconds = measure(lambda: testDecks(variations, 1, engine = engine, seed = seed))
+    return 1000 * len(variations), seconds
+
+def runBenchmarks(engine, games = 2000, seed = 1, quick = False) -> dict:
+    """Runs every benchmark and returns `{name: {"per second", "bytes"}}`.
+
+    Calls per second are timed over `games` games a deck, and bytes per
+    call traced over a tenth of them. `quick` leaves out the `testDecks`
+    iteration, which plays 185,000 games."""
+    timed, traced = {}, {}
+    for name, deck in decks.items():
+        for phase, cost in benchGames(engine, deck, games, seed).items():
+            timed[f"{name} {phase}"] = cost
+        timed[f"{name} nearbyDecks"] = benchNearby(deck, max(1, games // 4))
+
+    tracemalloc.start()
+    for name, deck in decks.items():
+        for phase, cost in benchGames(engine, deck, max(1, games // 10), seed, True).items():
+            traced[f"{name} {phase}"] = cost
+        traced[f"{name} nearbyDecks"] = benchNearby(deck, max(1, games // 40), True)
+    tracemalloc.stop()
+
+    if not quick:
+        timed["testDecks iteration"] = benchIteration(engine, seed)
+
+    results = {}
+    for name, (calls, seconds) in timed.items():
+        results[name] = {"per second": calls / max(seconds, 1e-12), "bytes": None}
+        if name in traced:
+            results[name]["bytes"] = traced[name][1] / traced[name][0]
+    return results
+
+def compare(results: dict, baseline: dict, tolerance = 0.1) -> list:
+    """Prints `results` beside `baseline` and returns the names of those that
+    are more than `tolerance` slower or allocate more than `tolerance` more."""
+    regressed = []
+    print(f"{'benchmark':<26}{'per second':>14}{'baseline':>14}{'change':>9}{'bytes':>11}{'baseline':>11}")
+    for name, now in results.items():
+        line = f"{name:<26}{now['per second']:>14,.0f}"
+        before = baseline.get(name)
+        if before is None:
+            line += f"{'':>23}"
+        else:
+            change = now["per second"] / before["per second"] - 1
+            line += f"{before['per second']:>14,.0f}{change:>+9.1%}"
+            if change < -tolerance or (now["bytes"] is not None and before["bytes"] is not None and
+                                       now["bytes"] > (1 + tolerance) * before["bytes"] + 64):
+                regressed.append(name)
+        line += f"{'' if now['bytes'] is None else format(now['bytes'], ',.0f'):>11}"
+        line += f"{'' if before is None or before['bytes'] is None else format(before['bytes'], ',.0f'):>11}"
+        print(line + ("  <- regressed" if name in regressed else ""))
+    return regressed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Benchmark the simulator and compare against a baseline.")
+    parser.add_argument("-e", "--engine", choices = ["list", "count", "batch"], default = "list", help = "game engine to benchmark")
+    parser.add_argument("-n", "--games", type = int, default = 2000, help = "games a deck to time each phase over")
+    parser.add_argument("-s", "--seed", type = int, default = 1, help = "seed the games are dealt from")
+    parser.add_argument("-f", "--baseline", default = "bench.json", help = "JSON file of baseline results, one set per engine")
+    parser.add_argument("-t", "--tolerance", type = float, default = 0.1, help = "slowdown or growth in allocations flagged as a regression")
+    parser.add_argument("--save", action = "store_true", help = "store these results as the engine's baseline")
+    parser.add_argument("--quick", action = "store_true", help = "leave out the testDecks iteration")
+    args = parser.parse_args()
+
+    engine = game
+    if args.engine == "count":
+        from countgame import countGame
+        engine = countGame
+    elif args.engine == "batch":
+        from batchgame import batchGame
+        engine = batchGame
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    results = runBenchmarks(engine, args.games, args.seed, args.quick)
+    regressed = compare(results, baselines.get(args.engine, {}), args.tolerance)
+
+    if args.save:
+        baselines[args.engine] = results
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent = 2)
+        print(f"saved as the {args.engine} baseline in {args.baseline}")
+    elif regressed:
+        print(f"{len(regressed)} regressed by more than {args.tolerance:.0%}")
+        sys.exit(1)
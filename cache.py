@@ -0,0 +1,87 @@
+"""
+Simulation cache
+----------------
+
+Keeps the result of every deck scored in a local SQLite file, so later runs
+look decks up instead of simulating them again. Results are keyed by the
+deck's card counts, the engine that played it, the number of games and the
+seed, and only decks that played all of their games are kept: a race or a
+bandit stops decks early by how they compare with the others scored with
+them, which a later run need not share. Results are tied to a fingerprint
+of the engine's code and the tables it plays by: changing the rules of an
+engine retires everything it scored before.
+"""
+
+import functools, hashlib, inspect, os, sqlite3
+
+import countgame, main, openings, shuffles
+from main import cardLookupDict
+
+def deckKey(deck) -> str:
+    """Returns the deck's card counts, a count vector as from `deckCounts`, as a string."""
+    return ",".join([str(n) for n in deck])
+
+@functools.lru_cache(maxsize = None)
+def engineVersion(engine) -> str:
+    """Returns a fingerprint of the rules `engine` plays by.
+
+    Covers the whole source of main.py and countgame.py, whose module tables
+    (the card table, the rule lists and what is built from them) every engine
+    plays by, and of the modules of the engine class and every class it
+    builds on, plus the card pool, how games are shuffled and the keep rule
+    of openings.py. Any change to
+    how games are played changes it, as do changes to those files that do
+    not, which only costs simulating decks again. The files are read once
+    per engine a process uses."""
+    h = hashlib.sha1(repr(cardLookupDict).encode())
+    h.update(inspect.getsource(shuffles).encode())
+    h.update(inspect.getsource(openings).encode())
+    files = [inspect.getsourcefile(main), inspect.getsourcefile(countgame)]
+    for cls in engine.__mro__:
+        if cls is not object:
+            files.append(inspect.getsourcefile(cls))
+    for path in dict.fromkeys(os.path.realpath(f) for f in files):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+class simCache():
+    """Open (or create) the results cache in the SQLite file at `path`."""
+
+    def __init__(self, path = "simcache.sqlite"):
+        self.db = sqlite3.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS results (
+            deck TEXT, engine TEXT, version TEXT, games INTEGER, seed INTEGER,
+            won INTEGER, played INTEGER,
+            PRIMARY KEY (deck, engine, version, games, seed))""")
+        self.db.commit()
+
+    def prune(self, engine) -> int:
+        """Deletes results from older versions of `engine` and returns how many went."""
+        n = self.db.execute("DELETE FROM results WHERE engine = ? AND version != ?",
+                            (engine.__qualname__, engineVersion(engine))).rowcount
+        self.db.commit()
+        return n
+
+    def lookup(self, decks: list, engine, games: int, seed = None) -> dict:
+        """Returns the cached `(won, played)` of each of `decks` that has one."""
+        name, version = engine.__qualname__, engineVersion(engine)
+        found = {}
+        for deck in decks:
+            row = self.db.execute("SELECT won, played FROM results WHERE deck = ? AND engine = ? AND version = ? AND games = ? AND seed = ?",
+                                  (deckKey(deck), name, version, games, -1 if seed is None else seed)).fetchone()
+            if row is not None:
+                found[deck] = row
+        return found
+
+    def store(self, results: dict, engine, games: int, seed = None) -> None:
+        """Saves the `(won, played)` result of each deck in `results` that played
+        all `games` games. Decks stopped early are left out."""
+        name, version = engine.__qualname__, engineVersion(engine)
+        self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            [(deckKey(deck), name, version, games, -1 if seed is None else seed, won, played)
+                             for deck, (won, played) in results.items() if played == games])
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
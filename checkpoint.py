@@ -0,0 +1,112 @@
+"""
+Checkpoints
+-----------
+
+Keeps the progress of a `testDecks` climb in a file, so a run that is
+killed or crashes can carry on where it stopped instead of starting over.
+A checkpoint holds:
+
+- the frontier, the decks the current iteration is scoring, and how many
+  iterations are left, as `testDecks` was called with,
+- the result of every deck scored in full, which is never played again.
+  These go to a binary results file beside it (see results.py), a record
+  appended as each deck is scored, so neither memory nor the checkpoint
+  itself grows with them; a resumed climb reads them back into its
+  `resultStore`,
+- the outcomes of the work units played for decks still being scored, so
+  their games are not played again either, though as their rule profiles
+  and game logs are not kept those cover only the games played after resuming,
+- the state of the `random` module and the best deck so far.
+
+The rest is saved as each iteration starts, and otherwise at most every
+`every` seconds as results come in, by writing a new file and moving it
+over the old one, so a kill while saving leaves the previous checkpoint
+whole. Units are matched by deck, first game and number of games, so resuming with
+a different number of workers, which splits decks differently, plays the
+games of decks that were part way through again.
+
+    python main.py --checkpoint FILE [--resume] ...
+"""
+
+import os, pickle, random, time
+
+from main import winRate
+from results import resultsWriter, loadResults
+
+class checkpoint():
+    """The progress of a climb, saved to the file at `path`, with the results
+    of the decks scored in full appended to `path` + ".results".
+
+    The results file is started afresh unless `resume`."""
+
+    def __init__(self, path = "checkpoint.pkl", every = 60.0, resume = False):
+        self.path = path
+        self.every = every
+        self.variations = []
+        self.left = 0
+        self.units = {}
+        self.best = None
+        if not resume and os.path.exists(path + ".results"):
+            os.remove(path + ".results")
+        self.results = resultsWriter(None, path + ".results")
+        self.saved = time.monotonic()
+
+    def begin(self, variations: list, left: int) -> None:
+        """Starts an iteration scoring `variations`, with `left` iterations to go, and saves."""
+        self.variations = list(variations)
+        self.left = left
+        self.save()
+
+    def scored(self, deck: tuple, result: tuple) -> None:
+        """Records the final `(won, played)` result of `deck`."""
+        self.results.write(deck, result)
+        if self.best is None or winRate(result) > winRate(self.best[1]):
+            self.best = (deck, result)
+        for key in [key for key in self.units if key[0] == deck]:
+            del self.units[key]
+        self.due()
+
+    def lookup(self, deck: tuple, start: int, games: int):
+        """Returns the outcomes of the `games` games of `deck` from game `start` if they were played, or None."""
+        return self.units.get((deck, start, games))
+
+    def add(self, deck: tuple, start: int, won: bytes) -> None:
+        """Records the outcomes of a unit of games of `deck` from game `start`."""
+        self.units[(deck, start, len(won))] = won
+        self.due()
+
+    def due(self) -> None:
+        """Saves if the last save was `every` seconds ago."""
+        if time.monotonic() - self.saved >= self.every:
+            self.save()
+
+    def scoredDecks(self):
+        """Yields the `(deck, result)` of every deck scored in full."""
+        _, records = loadResults(self.path + ".results")
+        for row in records:
+            yield tuple(int(n) for n in row["counts"]), (int(row["won"]), int(row["played"]))
+
+    def save(self) -> None:
+        state = {
+            "variations": self.variations,
+            "left": self.left,
+            "units": self.units,
+            "random": random.getstate(),
+            "best": self.best,
+        }
+        with open(self.path + ".tmp", "wb") as f:
+            pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(self.path + ".tmp", self.path)
+        self.saved = time.monotonic()
+
+def loadCheckpoint(path: str, every = 60.0) -> checkpoint:
+    """Returns the checkpoint saved at `path`, and sets the `random` module back to its state."""
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    c = checkpoint(path, every, resume = True)
+    c.variations = state["variations"]
+    c.left = state["left"]
+    c.units = state["units"]
+    c.best = state["best"]
+    random.setstate(state["random"])
+    return c
@@ -0,0 +1,675 @@
+"""
+Count-vector game engine
+------------------------
+
+Plays the same goldfish games as `main.game`, but keeps the unordered zones
+(hand, battlefield, tapped permanents and graveyard) as fixed-size lists of
+per-card counts indexed by `cardIndex`. Membership, counting and finding a
+card of a given kind are then single lookups instead of list scans. It plays
+by `game.go` and the same rule tables, with each rule written for counts.
+
+The library stays an ordered list, kept top card last as in `game`, and
+every shuffle is made on the same list in the same order as the list engine,
+so under a fixed seed both engines play out identical games.
+"""
+
+import random
+from colorama import Fore, Style
+
+from main import (game, cardLookupDict, cardIndex, cardTypes, manaValues, landMana,
+    obviousPolicy, priorityPolicy, indexFlags, cardMana, freeDigs, paidDigs, digRate, manaCeiling, LAND, UNTAPPED_LAND, TAPPED_LAND, CREATURE,
+    ARTEFACT, EASYDRAW, EARLY_PLAY, FILTERING, DRAW_SPELL, U, B, R, colorless,
+    plains, island, swamp, mountain, forest, spring, skerry, vent, star, petal,
+    offering, ritual, manamorphose, brainspoil, energytap, looting, kaervek,
+    ponder, preordain, knowledge, visions, gurmangler, attendants, sphere, wraith)
+
+nCards = len(cardIndex)
+cardNames = list(cardLookupDict.values())
+cardIds = list(cardLookupDict)
+noCards = [0] * nCards
+
+def indices(cards: list) -> list:
+    """Returns the dense indices of the cards in `cards`."""
+    return [cardIndex[card] for card in cards]
+
+def counts(cards: list) -> list:
+    """Returns a count vector for the cards in `cards`."""
+    c = [0] * nCards
+    for card in cards:
+        c[cardIndex[card]] += 1
+    return c
+
+# Dense indices of the cards the engine looks for by name
+PLAINS = cardIndex[plains]
+ISLAND = cardIndex[island]
+SWAMP = cardIndex[swamp]
+MOUNTAIN = cardIndex[mountain]
+FOREST = cardIndex[forest]
+SPRING = cardIndex[spring]
+SKERRY = cardIndex[skerry]
+VENT = cardIndex[vent]
+STAR = cardIndex[star]
+PETAL = cardIndex[petal]
+OFFERING = cardIndex[offering]
+RITUAL = cardIndex[ritual]
+MANAMORPHOSE = cardIndex[manamorphose]
+BRAINSPOIL = cardIndex[brainspoil]
+ENERGYTAP = cardIndex[energytap]
+LOOTING = cardIndex[looting]
+KAERVEK = cardIndex[kaervek]
+PONDER = cardIndex[ponder]
+PREORDAIN = cardIndex[preordain]
+KNOWLEDGE = cardIndex[knowledge]
+VISIONS = cardIndex[visions]
+GURMANGLER = cardIndex[gurmangler]
+ATTENDANTS = cardIndex[attendants]
+SPHERE = cardIndex[sphere]
+WRAITH = cardIndex[wraith]
+
+# Dense indices of the cards of each kind
+kindIndices = {flag: [i for i in range(0, nCards) if indexFlags[i] & flag]
+               for flag in [LAND, UNTAPPED_LAND, TAPPED_LAND, CREATURE, ARTEFACT, EASYDRAW, EARLY_PLAY, FILTERING, DRAW_SPELL]}
+
+# Basic lands and the colour they tap for
+basicColours = [(cardIndex[card], landMana[card].index(1)) for card in game.untappedLands]
+
+# Lands that enter tapped and the mana they make when sacrificed
+sacLandMana = [(cardIndex[card], landMana[card]) for card in game.lands if card not in game.untappedLands]
+
+# Permanents with a mana value, highest first, for `maxCMCon`
+valueLadder = sorted([(manaValues[card], cardIndex[card]) for card in cardIds
+                      if cardTypes[card] != "spell" and manaValues[card] > 0], reverse = True)
+
+# The cards `manaBound` counts as making mana or digging, and how much, by dense index
+handMana = [(cardIndex[card], cardMana[card]) for card in cardIds if cardMana[card]]
+handFreeDigs = [(cardIndex[card], freeDigs[card]) for card in cardIds if freeDigs[card]]
+handPaidDigs = [(cardIndex[card], paidDigs[card]) for card in cardIds if paidDigs[card]]
+
+# The obvious plays by the index of their card, in priority order, and the
+# bits of the priority rules each card index triggers from the hand and the battlefield
+obviousPlays = [(cardIndex[play[2]], play) for play in obviousPolicy.plays]
+handTriggers = [(cardIndex[card], bits) for card, bits in priorityPolicy.handBits.items()]
+fieldTriggers = [(cardIndex[card], bits) for card, bits in priorityPolicy.fieldBits.items()]
+
+
+class countGame(game):
+    """Start a new goldfishing game with the given deck, keeping zones as count vectors."""
+
+    __slots__ = ["handSize", "graveyardSize"]
+
+    # The cards `game` goes through in order, as dense indices
+    lands = indices(game.lands)
+    creatures = indices(game.creatures)
+    untappedLands = indices(game.untappedLands)
+    tappedLands = indices(game.tappedLands)
+
+    def __init__(self, deck: list, verbose = False, rng = random, profile = None, log = None):
+        self.deck = deck
+        self.profile = profile
+        self.verbose = verbose
+        self.policy = priorityPolicy
+        self.library = []
+        self.hand = [0] * nCards
+        self.graveyard = [0] * nCards
+        self.battlefield = [0] * nCards
+        self.tapped = [0] * nCards
+
+        self.reset(rng, log)
+
+    def clearZones(self) -> None:
+        """Empties the hand, graveyard, battlefield and tapped permanents."""
+        self.hand[:] = noCards
+        self.graveyard[:] = noCards
+        self.battlefield[:] = noCards
+        self.tapped[:] = noCards
+        self.handSize = 0
+        self.graveyardSize = 0
+
+    def state(self, full = False) -> None:
+        if self.log is not None:
+            self.log.mana(self.floating, self.storm)
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "Tu " + Style.RESET_ALL + Fore.CYAN + f"{self.turn} " +
+                Style.RESET_ALL + Style.DIM + "Ha " + Style.RESET_ALL + Fore.CYAN + f"{self.handSize} " +
+                Style.RESET_ALL + Style.DIM + "Ba " + Style.RESET_ALL + Fore.CYAN + f"{sum(self.battlefield)} " +
+                Style.RESET_ALL + Style.DIM + "Gr " + Style.RESET_ALL + Fore.CYAN + f"{self.graveyardSize} " +
+                Style.RESET_ALL + Style.DIM + "Li " + Style.RESET_ALL + Fore.CYAN + f"{len(self.library)} " +
+                Style.RESET_ALL + Style.DIM + "St " + Style.RESET_ALL + Fore.CYAN + f"{self.storm}" +
+                Style.RESET_ALL + Style.DIM + " : " + Style.RESET_ALL +
+                Fore.YELLOW + f"{self.floating[0]} " + Fore.BLUE + f"{self.floating[1]} " + Fore.MAGENTA + f"{self.floating[2]} " +
+                Fore.RED + f"{self.floating[3]} " + Fore.GREEN + f"{self.floating[4]} " + Fore.WHITE + f"{self.floating[5]}" + Style.RESET_ALL)
+            if full:
+                print(Style.RESET_ALL + Style.DIM + "  hand   " + Style.RESET_ALL + Fore.CYAN + str(self.zoneNames(self.hand)))
+                print(Style.RESET_ALL + Style.DIM + "  field  " + Style.RESET_ALL + Fore.CYAN + str(self.zoneNames(self.battlefield)))
+                print(Style.RESET_ALL + Style.DIM + "  tapped " + Style.RESET_ALL + Fore.CYAN + str(self.zoneNames(self.tapped)) + Style.RESET_ALL)
+                print(Style.RESET_ALL + Style.DIM + "  yard   " + Style.RESET_ALL + Fore.CYAN + str(self.zoneNames(self.graveyard)) + Style.RESET_ALL)
+
+    def zoneNames(self, zone: list) -> list:
+        """Returns the english names of the cards counted in `zone`."""
+        return [name for name, n in zip(cardNames, zone) for _ in range(0, n)]
+
+    def draw(self, n: int) -> None:
+        """Draw `n` cards."""
+
+        if self.verbose:
+            drawn = self.library[:-n - 1:-1]
+            print(Style.RESET_ALL + Style.DIM + "draws " + Style.RESET_ALL + Fore.CYAN + str(self.lookUpNames(drawn)) + Style.RESET_ALL)
+
+        for _ in range (0, n):
+            if len(self.library) == 0:
+                self.lose()
+                break
+            card = self.library.pop()
+            self.hand[cardIndex[card]] += 1
+            self.handSize += 1
+            if self.log is not None:
+                self.log.draw(card)
+
+    def scry(self, n: int) -> None:
+        """Scrys `n` cards."""
+        if len(self.library) < n:
+            self.lose()
+        peek = self.library[:-n - 1:-1]
+        del self.library[-n:]
+
+        bottom = []
+        top = []
+
+        wantCreatures = self.numberOfKind(CREATURE, self.hand) <= 0
+        wantFiltering = self.numberOfKind(FILTERING, self.hand) + self.numberOfKind(FILTERING, self.battlefield) <= 2
+        wantDraw = self.numberOfKind(EASYDRAW, self.hand) <= 1
+        wantKnowledge = self.numberOfKind(DRAW_SPELL, self.hand) <= 0 and sum(self.floating) > 5
+        wantLand = self.numberOfKind(UNTAPPED_LAND, self.hand) + self.numberOfKind(UNTAPPED_LAND, self.tapped) <= 0
+
+        # Kinds of card wanted on top
+        wanted = (wantCreatures or wantFiltering) * CREATURE | wantDraw * EASYDRAW | wantKnowledge * DRAW_SPELL | wantLand * UNTAPPED_LAND
+
+        for card in peek:
+            i = cardIndex[card]
+            flags = indexFlags[i]
+            if i == KAERVEK:
+                top.append(card)
+            elif flags & TAPPED_LAND:
+                bottom.append(card)
+
+            elif flags & wanted:
+                top.append(card)
+
+            else:
+                bottom.append(card)
+
+        for card in bottom:
+            self.library.insert(0, card)
+        for card in top:
+            self.library.append(card)
+
+        if self.log is not None:
+            self.log.scry(top, bottom)
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "scrys " + Style.RESET_ALL + Fore.CYAN + f"{self.lookUpNames(top)} top, {self.lookUpNames(bottom)} bottom" + Style.RESET_ALL)
+
+    def discard(self, n: int) -> None:
+        """Discards `n` card from hand."""
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "discards " + Style.RESET_ALL + Fore.CYAN + str(n) + Style.RESET_ALL)
+        for _ in range(0, n):
+            if self.numberOfKind(LAND, self.hand) > 0:
+                i = self.firstOf(self.lands, self.hand)
+            elif self.numberOfKind(CREATURE, self.hand) > 1:
+                i = self.firstOf(self.creatures, self.hand)
+            elif self.handSize > 0:
+                i = self.firstOf(range(0, nCards), self.hand)
+            else:
+                continue
+            self.toGraveyard(self.hand, i)
+            if self.log is not None:
+                self.log.discard(cardIds[i])
+
+    def mulligan(self) -> None:
+        """Draw hands and mulligan until we have a good enough hand."""
+        from openings import dealOpening
+
+        hand = dealOpening(self.library, self.rng)
+        self.library.reverse()
+        self.hand[:] = noCards
+        for card in hand:
+            self.hand[cardIndex[card]] += 1
+        self.handSize = len(hand)
+
+        if self.log is not None:
+            self.log.deal(hand, self.library[::-1])
+
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "keeps " + Style.RESET_ALL + Fore.CYAN + str(self.zoneNames(self.hand)) + Style.RESET_ALL)
+
+    def obviousPlay(self):
+        """Makes the first of `obviousRules` that can be played, in priority
+        order, and returns its play from `obviousPolicy`, or None if there is none."""
+        hand = self.hand
+        for i, play in obviousPlays:
+            if hand[i] and getattr(self, play[1])():
+                return play
+        return None
+
+    def triggeredRules(self) -> int:
+        """Returns the bits of the `policy` rules triggered by the cards in play.
+
+        Only `priorityPolicy` has its triggers by dense index; any other
+        policy is handed the cards in play by id."""
+        if self.policy is not priorityPolicy:
+            return self.policy.rules([cardIds[i] for i in range(0, nCards) if self.hand[i]],
+                                     [cardIds[i] for i in range(0, nCards) if self.battlefield[i]])
+        bits = 0
+        hand = self.hand
+        for i, cardBits in handTriggers:
+            if hand[i]:
+                bits |= cardBits
+        battlefield = self.battlefield
+        for i, cardBits in fieldTriggers:
+            if battlefield[i]:
+                bits |= cardBits
+        return bits
+
+    def manaBound(self) -> int:
+        """Returns an upper bound on the mana the turn could have at once from
+        here, or -1 if kaervek is out of reach, counted as by `game.manaBound`."""
+        hand, battlefield, tapped, library = self.hand, self.battlefield, self.tapped, self.library
+        free = battlefield[STAR] + battlefield[SPHERE] + sum([n * hand[i] for i, n in handFreeDigs])
+        depth = free + sum([n * hand[i] for i, n in handPaidDigs])
+        seen = cost = 0
+        found = hand[KAERVEK] > 0
+        for card in reversed(library):
+            if seen >= depth:
+                break
+            seen += 1
+            free += freeDigs[card]
+            depth += freeDigs[card] + paidDigs[card]
+            if card == kaervek and not found:
+                found = True
+                cost = max(0, seen - free + digRate - 1) // digRate
+        dug = library[len(library) - seen:]
+        cards = library if hand[BRAINSPOIL] or brainspoil in dug else dug
+        if not hand[KAERVEK] and kaervek not in cards:
+            return -1
+
+        made = sum(self.floating) + battlefield[PETAL] + sum(map(cardMana.__getitem__, cards)) - cost
+        made += sum([n * hand[i] for i, n in handMana])
+        return manaCeiling(made, hand[ENERGYTAP] + cards.count(energytap), hand[OFFERING] + cards.count(offering),
+                           hand[ATTENDANTS] + hand[GURMANGLER] + cards.count(attendants) + cards.count(gurmangler),
+                           battlefield[ATTENDANTS] + battlefield[GURMANGLER], tapped[ATTENDANTS] + tapped[GURMANGLER])
+
+    # Kaervek's touch to win the game
+    def ruleKaervek(self) -> bool:
+        if self.floating[R] >= 1 and sum(self.floating) >= 21:
+            self.spend(20, 0, 0, 0, 1, 0)
+            self.playNonPermanent(KAERVEK)
+            return True
+        return False
+
+    def rulePetal(self) -> bool:
+        self.playPermanent(PETAL)
+        return True
+
+    def ruleRitual(self) -> bool:
+        if self.floating[B] >= 1:
+            self.floating[B] += 2 # -1 +3
+            self.playNonPermanent(RITUAL)
+            return True
+        return False
+
+    def ruleWraith(self) -> bool:
+        # cycle wraith
+        self.storm -= 1
+        self.playNonPermanent(WRAITH)
+        self.draw(1)
+        return True
+
+    def ruleLand(self) -> bool:
+        played = self.playKindOfLand(self.untappedLands)
+        self.tapBasics()
+        return played
+
+    # Delve for creature
+    def ruleAttendants(self) -> bool:
+        if self.graveyardSize >= 7 and self.floating[B] >= 1:
+            self.spend(max(0, 7-self.graveyardSize),0,0,1)
+            self.delve(min(7, self.graveyardSize))
+
+            self.playPermanent(ATTENDANTS)
+            return True
+        return False
+
+    def ruleGurmangler(self) -> bool:
+        if self.graveyardSize >= 6 and self.floating[B] >= 1:
+            self.spend(max(0, 6-self.graveyardSize),0,0,1)
+            self.delve(min(6, self.graveyardSize))
+
+            self.playPermanent(GURMANGLER)
+            return True
+        return False
+
+    # Make mana
+    def rulePetalMana(self) -> bool:
+        self.make(1)
+        self.sac(PETAL)
+        return True
+
+    def ruleEnergytap(self) -> bool:
+        battlefield = self.battlefield
+        if self.floating[U] >= 1 and self.maxCMCon(battlefield) >= 7:
+            creature = ATTENDANTS if battlefield[ATTENDANTS] else GURMANGLER
+
+            self.spend(0, 0, 1)
+            self.floating[colorless] += self.maxCMCon(battlefield)
+
+            self.tap(creature)
+            self.playNonPermanent(ENERGYTAP)
+            return True
+        return False
+
+    def ruleOffering(self) -> bool:
+        battlefield = self.battlefield
+        tapped = self.tapped
+        if self.floating[B] >= 1 and (self.maxCMCon(battlefield) >= 7 or self.maxCMCon(tapped) >= 7):
+            if tapped[ATTENDANTS] or tapped[GURMANGLER]:
+                creature = ATTENDANTS if tapped[ATTENDANTS] else GURMANGLER
+
+                self.spend(0, 0, 0, 1)
+                self.make(self.maxCMCon(tapped), False, False, True, True, False)
+
+                self.sac(creature, True)
+                self.playNonPermanent(OFFERING)
+            else:
+                creature = ATTENDANTS if battlefield[ATTENDANTS] else GURMANGLER
+
+                self.spend(0, 0, 0, 1)
+                self.make(self.maxCMCon(battlefield), False, False, True, True, False)
+
+                self.sac(creature)
+                self.playNonPermanent(OFFERING)
+            return True
+        return False
+
+    # Filter mana
+    def ruleStarMana(self) -> bool:
+        if sum(self.floating) >= 1 and len(self.library) > 0:
+            self.spend(1)
+            self.make(1)
+            self.sac(STAR)
+            self.draw(1)
+            return True
+        return False
+
+    def ruleSphereMana(self) -> bool:
+        if sum(self.floating) >= 1 and len(self.library) > 0:
+            self.spend(1)
+            self.make(1)
+            self.draw(1)
+            self.sac(SPHERE)
+            return True
+        return False
+
+    def ruleStar(self) -> bool:
+        if sum(self.floating) >= 2 and len(self.library) > 0:
+            self.spend(1)
+            self.playPermanent(STAR)
+            return True
+        return False
+
+    def ruleSphere(self) -> bool:
+        if sum(self.floating) >= 2 and len(self.library) > 0:
+            self.spend(1)
+            self.playPermanent(SPHERE)
+            return True
+        return False
+
+    def ruleManamorphose(self) -> bool:
+        if self.floating[R] >= 1 and sum(self.floating) >= 2 and len(self.library) > 0:
+            self.spend(1, 0, 0, 0, 1)
+            self.make(2)
+            self.draw(1)
+
+            self.playNonPermanent(MANAMORPHOSE)
+            return True
+        return False
+
+    # Draw cards
+    def ruleKnowledge(self) -> bool:
+        battlefield = self.battlefield
+        tapped = self.tapped
+        if (sum(self.floating) >= 7 and self.floating[B] >= 1) and (self.numberOfKind(CREATURE, battlefield) + self.numberOfKind(CREATURE, tapped) >= 1) and len(self.library) >= self.maxCMCon(battlefield):
+            self.spend(4, 0, 1)
+            self.playNonPermanent(KNOWLEDGE)
+            # effect
+            cmc = max(self.maxCMCon(battlefield), self.maxCMCon(tapped))
+            self.draw(cmc)
+            return True
+        return False
+
+    def ruleBrainspoil(self) -> bool:
+        if self.floating[B] >= 2 and self.floating[U] >= 1 and sum(self.floating) >= 10 and self.library.count(knowledge) > 0 and len(self.library) > self.maxCMCon(self.battlefield):
+            # account for increase of storm (it shouldn't increase)
+            self.storm -= 1
+            self.playNonPermanent(BRAINSPOIL)
+
+            self.spend(1, 0, 0, 2)
+
+            self.searchLibrary(knowledge)
+            self.hand[KNOWLEDGE] += 1
+            self.handSize += 1
+            if self.log is not None:
+                self.log.tutor(knowledge)
+            self.shuffleLibrary()
+            return True
+        return False
+
+    # Dig for cards
+    def rulePonder(self) -> bool:
+        if self.floating[U] >= 1 and len(self.library) > 2:
+            # approximate ponder as scry 2
+            self.spend(0,0,1)
+            self.playNonPermanent(PONDER)
+
+            self.scry(2)
+            self.draw(1)
+            return True
+        return False
+
+    def rulePreordain(self) -> bool:
+        if self.floating[U] >= 1 and len(self.library) > 1:
+            self.spend(0,0,1)
+            self.playNonPermanent(PREORDAIN)
+
+            self.scry(2)
+            self.draw(1)
+            return True
+        return False
+
+    def ruleLooting(self) -> bool:
+        if self.floating[R] >= 1 and len(self.library) > 1:
+            self.spend(0,0,0,0,1)
+            self.playNonPermanent(LOOTING)
+
+            self.draw(2)
+            self.discard(2)
+            return True
+        return False
+
+    def ruleVisions(self) -> bool:
+        if self.floating[U] >= 1 and len(self.library) > 2:
+            self.spend(0,0,1)
+            self.playNonPermanent(VISIONS)
+
+            self.draw(1)
+            self.scry(2)
+            return True
+        return False
+
+    def playKindOfLand(self, landList) -> bool:
+        """Plays a land from the hand, preferring lands earlier in the given list."""
+        i = self.firstOf(landList, self.hand)
+        if i < 0:
+            return False
+
+        self.statePlayFromHand(i)
+        if self.log is not None:
+            self.log.land(cardIds[i])
+
+        self.hand[i] -= 1
+        self.handSize -= 1
+        if indexFlags[i] & UNTAPPED_LAND:
+            self.battlefield[i] += 1
+        else:
+            self.tapped[i] += 1
+        return True
+
+    def playStars(self) -> None:
+        """Plays stars and spheres on turn 3."""
+        for _ in range(0, self.numberOfKind(ARTEFACT, self.hand)):
+            # If we have mana
+            if sum(self.floating) > 0 and self.hand[STAR]:
+                self.statePlayFromHand(STAR)
+                if self.log is not None:
+                    self.log.play(star)
+                self.hand[STAR] -= 1
+                self.handSize -= 1
+                self.battlefield[STAR] += 1
+                self.storm += 1
+                # Use the mana
+                for i in range(0, len(self.floating)):
+                    if self.floating[i] > 0:
+                        self.floating[i] -= 1
+                        break
+
+    def tapLands(self) -> None:
+        """Taps all lands for mana (doesn't sac)."""
+        self.tapBasics()
+        for _ in range(4):
+            if self.battlefield[SPRING]:
+                self.floating[1] += 1
+                self.tap(SPRING)
+            elif self.battlefield[VENT]:
+                self.floating[2] += 1
+                self.tap(VENT)
+
+        self.state()
+
+    def tapSacLands(self) -> None:
+        """Taps and sacs lands for mana (on turn 4)."""
+        self.tapBasics()
+        for i, mana in sacLandMana:
+            for _ in range(0, self.battlefield[i]):
+                for colour, n in enumerate(mana):
+                    self.floating[colour] += n
+                self.sac(i)
+
+        self.state()
+
+    def tapBasics(self) -> None:
+        for i, colour in basicColours:
+            n = self.battlefield[i]
+            if n:
+                self.floating[colour] += n
+                self.battlefield[i] = 0
+                self.tapped[i] += n
+
+    def numberOfKind(self, flag: int, items: list) -> int:
+        """Counts the cards of kind `flag` in the zone `items`."""
+        return sum([items[i] for i in kindIndices[flag]])
+
+    def firstOf(self, seek, items: list) -> int:
+        """Returns the first index in `seek` present in the zone `items`, or -1."""
+        for i in seek:
+            if items[i]:
+                return i
+        return -1
+
+    def numberOfSpells(self) -> int:
+        """Shortcut function to return the number of spells in hand."""
+        return self.handSize - self.numberOfKind(LAND, self.hand)
+
+    def clearForNewTurn(self) -> None:
+        """Resets for new turn."""
+        self.floating = [0, 0, 0, 0, 0, 0]
+        self.storm = 0
+        for i in range(0, nCards):
+            self.battlefield[i] += self.tapped[i]
+            self.tapped[i] = 0
+
+    def toGraveyard(self, zone: list, i: int) -> None:
+        """Moves a card with index `i` from `zone` to the graveyard."""
+        zone[i] -= 1
+        if zone is self.hand:
+            self.handSize -= 1
+        self.graveyard[i] += 1
+        self.graveyardSize += 1
+
+    def sac(self, i: int, tapped = False) -> None:
+        """Sacs a card with index `i` from the battlefield and adds it to the graveyard."""
+        if self.log is not None:
+            self.log.sac(cardIds[i])
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "sacs " + Style.RESET_ALL + Fore.CYAN + self.lookUpName(i) + Style.RESET_ALL)
+        self.toGraveyard(self.tapped if tapped else self.battlefield, i)
+
+    def tap(self, i: int) -> None:
+        if self.log is not None:
+            self.log.tap(cardIds[i])
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "taps " + Style.RESET_ALL + Fore.CYAN + self.lookUpName(i) + Style.RESET_ALL)
+        self.battlefield[i] -= 1
+        self.tapped[i] += 1
+
+    def delve(self, n: int) -> None:
+        """Exile cards from graveyard when delving for creatures."""
+        if self.log is not None:
+            self.log.delve(n)
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "delves " + Style.RESET_ALL + Fore.CYAN + str(n) + Style.RESET_ALL)
+        for _ in range(0,n):
+            self.graveyard[self.firstOf(range(0, nCards), self.graveyard)] -= 1
+            self.graveyardSize -= 1
+
+    def playPermanent(self, i: int) -> None:
+        """Plays a card with index `i` from the hand and adds it to the battlefield."""
+        if self.log is not None:
+            self.log.play(cardIds[i])
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "plays " + Style.RESET_ALL + Fore.CYAN + self.lookUpName(i) +
+                  Style.RESET_ALL + Style.DIM + " -> field " + Style.RESET_ALL + Fore.CYAN + str(self.zoneNames(self.battlefield)) + Style.RESET_ALL)
+        self.hand[i] -= 1
+        self.handSize -= 1
+        self.battlefield[i] += 1
+        self.storm += 1
+
+    def playNonPermanent(self, i: int) -> None:
+        if self.log is not None:
+            self.log.cast(cardIds[i])
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "plays " + Style.RESET_ALL + Fore.CYAN + self.lookUpName(i) +
+                  Style.RESET_ALL + Style.DIM + " -> yard " + Style.RESET_ALL + Fore.CYAN + str(self.zoneNames(self.graveyard)) + Style.RESET_ALL)
+        self.toGraveyard(self.hand, i)
+        self.storm += 1
+
+    def maxCMCon(self, place: list) -> int:
+        """Returns the highest mana value of the permanents counted in `place`, or 0."""
+        for value, i in valueLadder:
+            if place[i]:
+                return value
+        return 0
+
+    def lookUpName(self, i: int) -> str:
+        """Returns the english name of the card with index `i`."""
+        return cardNames[i]
+
+    def statePlayFromHand(self, i: int) -> None:
+        """If verbose, makes a pretty statement about a play."""
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "plays " + Style.RESET_ALL + Fore.CYAN + self.lookUpName(i) +
+                  Style.RESET_ALL + Style.DIM + " -> field " + Style.RESET_ALL + Fore.CYAN + str(self.zoneNames(self.battlefield)) + Style.RESET_ALL)
+
+class giveUpCountGame(countGame):
+    """A `countGame` that gives up on turns it can no longer win, as `giveUpGame` does."""
+
+    __slots__ = []
+    giveUp = True
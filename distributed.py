@@ -0,0 +1,203 @@
+"""
+Distributed play
+----------------
+
+Spreads the games of a search over worker processes on other machines. A
+`coordinator` stands in for the `multiprocessing.Pool` that `playDecks`
+takes, so the search runs unchanged in the coordinating process, which
+keeps the `nearbyDecks` frontier and the `wins` table. The
+`(deck, games, engine, seed, start, ...)` units that `splitGames` makes
+are what it hands out, and workers send back each unit's outcomes as
+`playChunk` returns them.
+
+Workers connect over `multiprocessing.connection`, authenticated with a
+shared key, and can join or leave at any time. Both ends unpickle what the
+other sends, so anyone holding the key can run code on them: the
+coordinator makes a random key and prints it unless given one, and workers
+must be given it. A unit whose worker leaves, dies or takes longer than
+`timeout` seconds to send it back is handed to the next free worker, and as
+game k of a seeded run is always dealt the same, which worker played a unit
+never changes its outcomes.
+
+    python main.py --listen HOST:PORT [--key KEY] [--timeout SECONDS] -w WORKERS ...
+    python distributed.py worker HOST:PORT --key KEY
+    python distributed.py check [-w WORKERS]
+"""
+
+import argparse, io, itertools, pickle, queue, secrets, sys, threading, time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+# Seconds a worker may take over a unit before it is given to another
+defaultTimeout = 600.0
+
+def parseAddress(address: str) -> tuple:
+    """Returns the `(host, port)` of a "HOST:PORT" string."""
+    host, _, port = address.rpartition(":")
+    return host, int(port)
+
+class taskUnpickler(pickle.Unpickler):
+    """Reads tasks sent by a coordinator running main.py as a script, whose
+    functions and engines are pickled as `__main__`'s, from `main`."""
+
+    def find_class(self, module: str, name: str):
+        return super().find_class("main" if module == "__main__" else module, name)
+
+class coordinator():
+    """Hands out the work of `imap_unordered` to the workers connected to
+    `address` with `key`, putting a unit back in the queue if its worker goes
+    before returning it or takes more than `timeout` seconds, or forever if None.
+
+    Without a `key` a random one is made, which workers are to be given."""
+
+    def __init__(self, address = ("", 6000), key = None, timeout = defaultTimeout):
+        self.key = key if key is not None else secrets.token_hex(16).encode()
+        self.listener = Listener(address, authkey = self.key)
+        self.address = self.listener.address
+        self.timeout = timeout
+        self.tasks = queue.Queue()
+        self.replies = queue.Queue()
+        self.ids = itertools.count()
+        self.returned = 0
+        self.lock = threading.Lock()
+        self.closed = False
+        threading.Thread(target = self.accept, daemon = True).start()
+
+    def accept(self) -> None:
+        """Serves every worker that connects, each from a thread of its own."""
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except (OSError, AuthenticationError):
+                continue
+            threading.Thread(target = self.serve, args = (conn,), daemon = True).start()
+
+    def serve(self, conn) -> None:
+        """Sends one worker a task at a time until it goes or the coordinator closes."""
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    # Leave the sentinel for the other workers' threads
+                    self.tasks.put(None)
+                    conn.send(None)
+                    return
+                try:
+                    conn.send(task)
+                    if self.timeout is not None and not conn.poll(self.timeout):
+                        raise TimeoutError
+                    self.replies.put(conn.recv())
+                    with self.lock:
+                        self.returned += 1
+                except (EOFError, OSError):
+                    self.tasks.put(task)
+                    return
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def imap_unordered(self, func, iterable):
+        """Yields `func(x)` for each x of `iterable` in the order workers finish
+        them, raising any exception a worker raised."""
+        waiting = set()
+        for x in iterable:
+            task = (next(self.ids), func, x)
+            waiting.add(task[0])
+            self.tasks.put(task)
+        while waiting:
+            n, ok, result = self.replies.get()
+            if n not in waiting:
+                continue
+            waiting.remove(n)
+            if not ok:
+                raise result
+            yield result
+
+    def close(self) -> None:
+        """Tells the workers to stop and stops taking new ones."""
+        self.closed = True
+        self.tasks.put(None)
+        self.listener.close()
+
+def work(address: tuple, key: bytes, patience = 60.0) -> int:
+    """Plays the tasks the coordinator at `address`, which shares `key`,
+    sends until it says to stop, and returns how many were played.
+
+    If the coordinator is not there yet, or goes away, it is tried again
+    every second for `patience` seconds."""
+    played = 0
+    while True:
+        conn = None
+        deadline = time.monotonic() + patience
+        while conn is None:
+            try:
+                conn = Client(address, authkey = key)
+            except OSError:
+                if time.monotonic() > deadline:
+                    return played
+                time.sleep(1.0)
+        try:
+            while True:
+                task = taskUnpickler(io.BytesIO(conn.recv_bytes())).load()
+                if task is None:
+                    return played
+                n, func, x = task
+                try:
+                    reply = (n, True, func(x))
+                except Exception as e:
+                    reply = (n, False, e)
+                conn.send(reply)
+                played += 1
+        except (EOFError, OSError):
+            conn.close()
+
+def check(workers = 3, decks = 4, games = 1000, seed = 1) -> bool:
+    """Plays `decks` seeded decks through a local coordinator and `workers`
+    worker processes, killing one worker once a quarter of the units are
+    back and starting another, and returns whether every outcome matches
+    playing them here."""
+    import multiprocessing
+    from main import default, deckCounts, deckOptions, nearbyDecks, playDecks, splitGames
+
+    chosen = nearbyDecks(deckCounts(default), deckOptions)[:decks]
+    expected = playDecks(chosen, games, seed = seed)
+
+    pool = coordinator(("localhost", 0))
+    start = lambda: multiprocessing.Process(target = work, args = (pool.address, pool.key), daemon = True)
+    processes = [start() for _ in range(0, workers)]
+    for p in processes:
+        p.start()
+
+    units = len(splitGames(chosen, games, 4 * workers))
+    def churn():
+        while pool.returned < units // 4:
+            time.sleep(0.01)
+        processes[0].kill()
+        print(f"killed worker {processes[0].pid}")
+        processes.append(start())
+        processes[-1].start()
+    threading.Thread(target = churn, daemon = True).start()
+
+    played = playDecks(chosen, games, pool = pool, workers = 4 * workers, seed = seed)
+    pool.close()
+    for p in processes[1:]:
+        p.join(10)
+    same = played == expected
+    print(f"{decks} decks of {games} games over {workers} workers: " + ("outcomes match" if same else "outcomes differ"))
+    return same
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Play games for a coordinator, or check distributed play locally.")
+    parser.add_argument("mode", choices = ["worker", "check"], help = "worker: play for the coordinator at ADDRESS; check: compare local workers with playing here")
+    parser.add_argument("address", nargs = "?", default = "localhost:6000", help = "HOST:PORT of the coordinator")
+    parser.add_argument("-k", "--key", help = "key the coordinator printed or was given, needed by a worker")
+    parser.add_argument("-w", "--workers", type = int, default = 3, help = "local workers to check with")
+    args = parser.parse_args()
+
+    if args.mode == "worker":
+        if args.key is None:
+            parser.error("a worker needs the coordinator's --key")
+        print(f"played {work(parseAddress(args.address), args.key.encode())} units")
+    elif not check(args.workers):
+        sys.exit(1)
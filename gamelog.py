@@ -0,0 +1,220 @@
+"""
+Game logs
+---------
+
+A compact binary log of what happens in a game: the hand kept and the order
+of the library after every shuffle, then each turn, draw, play, sacrifice,
+tap, delve, scry, discard and change to the mana pool, with the card's id.
+It is the same story `verbose` prints, but costs a few bytes an event, so a
+sample of the games in a real run can be logged, and `render` tells any of
+them again later without playing it.
+
+A log file starts with a header naming the cards, followed by one record
+per logged game: its length, deck counts, seed, game number, whether it was
+won, then its events.
+
+    python gamelog.py games.log         lists the games logged
+    python gamelog.py games.log 12      replays the 13th of them
+    python gamelog.py games.log lost    replays the first game lost
+"""
+
+import struct, sys
+from colorama import Fore, Style
+
+from main import cardLookupDict
+
+MAGIC = b"FISHLOG1"
+
+# Events, each an opcode byte followed by its arguments
+DEAL, SHUFFLE, TURN, DRAW, SCRY, DISCARD, LAND, PLAY, CAST, SAC, TAP, DELVE, TUTOR, MANA, WIN, LOSE = range(0, 16)
+
+class gameLog():
+    """Start an empty log of one game's events. Cards are logged by id."""
+
+    def __init__(self):
+        self.events = bytearray()
+        self.pool = b""
+
+    def deal(self, hand: list, library: list) -> None:
+        self.piles(DEAL, hand, library)
+
+    def shuffle(self, library: list) -> None:
+        self.piles(SHUFFLE, library)
+
+    def turn(self, turn: int) -> None:
+        self.events += bytes((TURN, turn))
+
+    def draw(self, card: int) -> None:
+        self.events += bytes((DRAW, card))
+
+    def scry(self, top: list, bottom: list) -> None:
+        self.piles(SCRY, top, bottom)
+
+    def discard(self, card: int) -> None:
+        self.events += bytes((DISCARD, card))
+
+    def land(self, card: int) -> None:
+        self.events += bytes((LAND, card))
+
+    def play(self, card: int) -> None:
+        """Logs a permanent played from the hand."""
+        self.events += bytes((PLAY, card))
+
+    def cast(self, card: int) -> None:
+        """Logs a spell cast from the hand."""
+        self.events += bytes((CAST, card))
+
+    def sac(self, card: int) -> None:
+        self.events += bytes((SAC, card))
+
+    def tap(self, card: int) -> None:
+        self.events += bytes((TAP, card))
+
+    def delve(self, n: int) -> None:
+        self.events += bytes((DELVE, n))
+
+    def tutor(self, card: int) -> None:
+        """Logs a card taken from the library into the hand."""
+        self.events += bytes((TUTOR, card))
+
+    def mana(self, floating: list, storm: int) -> None:
+        """Logs the mana pool and storm count, if they changed."""
+        pool = struct.pack("<B7h", MANA, *floating, storm)
+        if pool != self.pool:
+            self.events += pool
+            self.pool = pool
+
+    def win(self, card: int) -> None:
+        self.events += bytes((WIN, card))
+
+    def lose(self) -> None:
+        self.events.append(LOSE)
+
+    def piles(self, op: int, *piles: list) -> None:
+        self.events.append(op)
+        for pile in piles:
+            self.events.append(len(pile))
+            self.events += bytes(pile)
+
+class gameLogger():
+    """Logs every `every`th game played, by game number, to the file at `path`.
+
+    Without a `path`, logged games are kept in `records` to be passed on,
+    which is how worker processes hand theirs back. The file is started
+    afresh unless `append`, when it is added to, as a resumed run does, as
+    long as it was written for the same cards."""
+
+    def __init__(self, every = 1000, path = None, append = False):
+        self.every = every
+        self.records = []
+        self.file = None
+        if path is not None:
+            cards = list(cardLookupDict)
+            header = MAGIC + struct.pack(f"<I{len(cards)}H", len(cards), *cards)
+            self.file = open(path, "ab+" if append else "wb")
+            if self.file.tell() == 0:
+                self.file.write(header)
+            else:
+                self.file.seek(0)
+                if self.file.read(len(header)) != header:
+                    raise ValueError(f"{path} is a game log for a different card pool")
+
+    def wants(self, k: int) -> bool:
+        """Returns whether game number `k` should be logged."""
+        return k % self.every == 0
+
+    def add(self, deck, seed, k: int, won: bool, log: gameLog) -> None:
+        """Adds the log of game `k` played with `deck`, a count vector."""
+        self.write(struct.pack(f"<{len(deck)}BqIB", *deck, -1 if seed is None else seed, k, won) + log.events)
+
+    def write(self, record: bytes) -> None:
+        """Adds a record made by `add`, possibly in another process."""
+        if self.file is None:
+            self.records.append(record)
+        else:
+            self.file.write(struct.pack("<I", len(record)) + record)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+def readLogs(path: str) -> list:
+    """Returns the `(deck, seed, k, won, events)` of every game in the log file
+    at `path`. `deck` is its card counts and `seed` is None if unseeded."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[0:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a game log")
+    nCards, = struct.unpack_from("<I", data, len(MAGIC))
+    at = len(MAGIC) + 4 + 2 * nCards
+    head = struct.Struct(f"<{nCards}BqIB")
+
+    games = []
+    while at < len(data):
+        size, = struct.unpack_from("<I", data, at)
+        fields = head.unpack_from(data, at + 4)
+        deck, seed, k, won = fields[0:nCards], fields[nCards], fields[nCards + 1], bool(fields[nCards + 2])
+        games.append((deck, None if seed < 0 else seed, k, won, data[at + 4 + head.size:at + 4 + size]))
+        at += 4 + size
+    return games
+
+def names(cards) -> str:
+    return str([cardLookupDict.get(card, str(card)) for card in cards])
+
+def render(events: bytes) -> list:
+    """Returns the lines telling the game in `events`, as `verbose` would."""
+    dim = lambda text: Style.RESET_ALL + Style.DIM + text + Style.RESET_ALL + Fore.CYAN
+    lines = []
+    at = 0
+
+    def pile():
+        nonlocal at
+        n = events[at]
+        at += 1 + n
+        return events[at - n:at]
+
+    while at < len(events):
+        op = events[at]
+        at += 1
+        if op == DEAL:
+            hand, library = pile(), pile()
+            lines.append(dim("keeps ") + names(hand) + Style.RESET_ALL)
+            lines.append(dim("library ") + names(library) + Style.RESET_ALL)
+        elif op == SHUFFLE:
+            lines.append(dim("shuffles ") + names(pile()) + Style.RESET_ALL)
+        elif op == TURN:
+            lines.append(f"\n# TURN {events[at]}")
+            at += 1
+        elif op == SCRY:
+            top, bottom = pile(), pile()
+            lines.append(dim("scrys ") + f"{names(top)} top, {names(bottom)} bottom" + Style.RESET_ALL)
+        elif op == MANA:
+            w, u, b, r, g, c, storm = struct.unpack_from("<7h", events, at)
+            at += 14
+            lines.append(dim("St ") + f"{storm}" + dim(" : ") + Fore.YELLOW + f"{w} " + Fore.BLUE + f"{u} " +
+                         Fore.MAGENTA + f"{b} " + Fore.RED + f"{r} " + Fore.GREEN + f"{g} " + Fore.WHITE + f"{c}" + Style.RESET_ALL)
+        elif op == DELVE:
+            lines.append(dim("delves ") + str(events[at]) + Style.RESET_ALL)
+            at += 1
+        elif op == WIN:
+            lines.append(f"WON BY {cardLookupDict[events[at]]}!")
+            at += 1
+        elif op == LOSE:
+            lines.append("LOST :(")
+        else:
+            verb = {DRAW: "draws ", DISCARD: "discards ", LAND: "plays land ", PLAY: "plays ",
+                    CAST: "casts ", SAC: "sacs ", TAP: "taps ", TUTOR: "tutors "}[op]
+            lines.append(dim(verb) + cardLookupDict[events[at]] + Style.RESET_ALL)
+            at += 1
+    return lines
+
+if __name__ == "__main__":
+    games = readLogs(sys.argv[1])
+    if len(sys.argv) < 3:
+        for i, (deck, seed, k, won, events) in enumerate(games):
+            print(f"{i:>6}  game {k:>8}  seed {seed}  {'won ' if won else 'lost'}  {len(events):>5} bytes  deck {','.join(map(str, deck))}")
+    else:
+        i = [won for _, _, _, won, _ in games].index(False) if sys.argv[2] == "lost" else int(sys.argv[2])
+        deck, seed, k, won, events = games[i]
+        print(f"# GAME {k} OF SEED {seed}, DECK {','.join(map(str, deck))}")
+        print("\n".join(render(events)))
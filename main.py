@@ -8,8 +8,7 @@ Optimise a fishelbrand deck by goldfishing it and making small changes.
 """
 
 import random, time, itertools, numpy
-import threading
-from copy import deepcopy
+import argparse, multiprocessing
 from colorama import Fore, Style
 from tqdm import tqdm
 
@@ -47,33 +46,91 @@ sphere       = 203
 wraith       = 233
 # epicure      = 234
 
-cardLookupDict = {
-    1: 'plains',
-    2: 'island',
-    3: 'swamp',
-    4: 'mountain',
-    5: 'forest',
-    11: 'spring',
-    12: 'skerry',
-    13: 'vent',
-    101: 'star',
-    102: 'petal',
-    111: 'offering',
-    112: 'ritual',
-    113: 'manamorphose',
-    121: 'brainspoil',
-    122: 'energytap',
-    123: 'looting',
-    124: 'kaervek',
-    125: 'ponder',
-    126: 'preordain',
-    127: 'knowledge',
-    128: 'visions',
-    131: 'gurmangler',
-    132: 'attendants',
-    203: 'sphere',
-    233: 'wraith'
-}
+# The card pool, a row a card: its id, name, type, mana value, the mana it
+# makes when tapped or sacrificed (WUBRG colourless) and the kinds of card
+# the rules look for it as. Everything else about a card is derived from here.
+cardTable = [
+    # id          name            type        mv  mana                  kinds
+    (plains,       "plains",       "land",      0, (1, 0, 0, 0, 0, 0), []),
+    (island,       "island",       "land",      0, (0, 1, 0, 0, 0, 0), []),
+    (swamp,        "swamp",        "land",      0, (0, 0, 1, 0, 0, 0), []),
+    (mountain,     "mountain",     "land",      0, (0, 0, 0, 1, 0, 0), []),
+    (forest,       "forest",       "land",      0, (0, 0, 0, 0, 1, 0), []),
+    (spring,       "spring",       "land",      0, (1, 0, 1, 0, 0, 0), ["enters tapped"]),
+    (skerry,       "skerry",       "land",      0, (0, 2, 0, 0, 0, 0), ["enters tapped"]),
+    (vent,         "vent",         "land",      0, (0, 1, 0, 1, 0, 0), ["enters tapped"]),
+    (star,         "star",         "artifact",  1, None, ["easy draw", "early play", "filtering"]),
+    (petal,        "petal",        "artifact",  0, None, ["filtering"]),
+    (offering,     "offering",     "spell",     1, None, []),
+    (ritual,       "ritual",       "spell",     1, None, []),
+    (manamorphose, "manamorphose", "spell",     2, None, ["easy draw", "filtering"]),
+    (brainspoil,   "brainspoil",   "spell",     6, None, ["draw"]),
+    (energytap,    "energytap",    "spell",     1, None, []),
+    (looting,      "looting",      "spell",     1, None, ["easy draw"]),
+    (kaervek,      "kaervek",      "spell",     1, None, []),
+    (ponder,       "ponder",       "spell",     1, None, ["easy draw"]),
+    (preordain,    "preordain",    "spell",     1, None, ["easy draw"]),
+    (knowledge,    "knowledge",    "spell",     5, None, ["draw"]),
+    (visions,      "visions",      "spell",     1, None, ["easy draw"]),
+    (gurmangler,   "gurmangler",   "creature",  7, None, []),
+    (attendants,   "attendants",   "creature",  8, None, []),
+    (sphere,       "sphere",       "artifact",  1, None, ["easy draw", "early play", "filtering"]),
+    # (weather,    "weather",      ...),
+    (wraith,       "wraith",       "creature",  5, None, []),
+    # (epicure,    "epicure",      ...),
+]
+
+cardLookupDict = {card: name for card, name, _, _, _, _ in cardTable}
+cardTypes = {card: kind for card, _, kind, _, _, _ in cardTable}
+manaValues = {card: mv for card, _, _, mv, _, _ in cardTable}
+landMana = {card: mana for card, _, kind, _, mana, _ in cardTable if kind == "land"}
+
+# Kinds of card, as bit flags
+LAND, UNTAPPED_LAND, TAPPED_LAND, CREATURE, ARTEFACT, EASYDRAW, EARLY_PLAY, FILTERING, DRAW_SPELL = [1 << bit for bit in range(0, 9)]
+kindFlags = {"land": LAND, "creature": CREATURE, "artifact": ARTEFACT, "enters tapped": TAPPED_LAND,
+             "easy draw": EASYDRAW, "early play": EARLY_PLAY, "filtering": FILTERING, "draw": DRAW_SPELL}
+
+def flagsOf(kind: str, kinds: list) -> int:
+    """Returns the kind flags of a card of type `kind` flagged as `kinds` in `cardTable`."""
+    flags = kindFlags.get(kind, 0)
+    for k in kinds:
+        flags |= kindFlags[k]
+    if flags & LAND and not flags & TAPPED_LAND:
+        flags |= UNTAPPED_LAND
+    return flags
+
+# The kind flags of every card, indexed by card id, so checking a card's kind
+# is one lookup: `cardFlags[card] & LAND`. Cards not in the table have none.
+cardFlags = [0] * (max(cardLookupDict) + 1)
+for card, _, kind, _, _, kinds in cardTable:
+    cardFlags[card] = flagsOf(kind, kinds)
+cardFlags = tuple(cardFlags)
+
+cardFlagArray = numpy.array(cardFlags, dtype = numpy.uint16)
+cardFlagArray.flags.writeable = False
+
+def classify(cards) -> numpy.ndarray:
+    """Returns the kind flags of each card of `cards`, by id, in one vectorized lookup."""
+    return cardFlagArray[numpy.asarray(cards, dtype = numpy.intp)]
+
+def cardsOfType(kind: str) -> list:
+    """Returns the ids of the cards of type `kind`, in table order."""
+    return [card for card, _, t, _, _, _ in cardTable if t == kind]
+
+def cardsOfKind(kind: str) -> list:
+    """Returns the ids of the cards flagged as `kind`, in table order."""
+    return [card for card, _, _, _, _, kinds in cardTable if kind in kinds]
+
+# Dense index of each card, for engines that keep zones as per-card counts
+cardIndex = {card: i for i, card in enumerate(cardLookupDict)}
+nCards = len(cardLookupDict)
+
+# The kind flags of each card by dense index, and as a 0/1 vector a kind
+indexFlags = tuple(cardFlags[card] for card in cardLookupDict)
+
+def kindVector(flag: int) -> numpy.ndarray:
+    """Returns a 0/1 vector over dense card indices marking the cards of kind `flag`."""
+    return ((cardFlagArray[list(cardLookupDict)] & flag) != 0).astype(numpy.int32)
 
 W = 0
 U = 1
@@ -145,6 +202,118 @@ deckOptions = [
     star,
 ]
 
+# Any number of these may go in a deck, anything else is limited to 4
+basics = [plains, island, swamp, mountain, forest]
+
+# What `game.go` plays, as `(rule, zone, card, ending)`: the name the rule is
+# profiled under, the zone its card must be in for it to be tried, and how the
+# game ends once it is played, if it does. A rule is played by the engine's
+# method named after it, e.g. "petal mana" by `rulePetalMana`, which returns
+# whether it could be played.
+#
+# Obvious plays are made as soon as they can be.
+obviousRules = [
+    ("kaervek", "hand", kaervek, "won"),
+    ("petal", "hand", petal, None),
+    ("ritual", "hand", ritual, None),
+    ("wraith", "hand", wraith, None),
+] + [("land", "hand", land, None) for land in basics]
+
+# Once none can, the first of these that can be played is, in this order:
+#    1. PLAY DELVE CREATURE
+#    2. GENERATE MANA
+#    3. DRAW CARDS
+#    4. DIG
+# Looting never counts as having played something, so the game is stuck after it.
+priorityRules = [
+    ("attendants", "hand", attendants, None),
+    ("gurmangler", "hand", gurmangler, None),
+    ("petal mana", "battlefield", petal, None),
+    ("energytap", "hand", energytap, None),
+    ("offering", "hand", offering, None),
+    ("star mana", "battlefield", star, None),
+    ("sphere mana", "battlefield", sphere, None),
+    ("star", "hand", star, None),
+    ("sphere", "hand", sphere, None),
+    ("manamorphose", "hand", manamorphose, None),
+    ("knowledge", "hand", knowledge, None),
+    ("brainspoil", "hand", brainspoil, None),
+    ("ponder", "hand", ponder, None),
+    ("preordain", "hand", preordain, None),
+    ("looting", "hand", looting, "stuck"),
+    ("visions", "hand", visions, None),
+]
+
+class rulePolicy():
+    """Compiles `rules` into a dispatch on the cards in play: each rule gets a
+    bit, and `handBits` and `fieldBits` map a card to the bits of the rules it
+    triggers from the hand and from the battlefield. OR-ing them over the
+    cards in the zones gives every rule worth trying in one pass, lowest bit
+    first, however many rules there are.
+
+    `plays` holds each rule's `(rule, method name, card, ending)` by bit."""
+
+    def __init__(self, rules: list):
+        self.handBits = {}
+        self.fieldBits = {}
+        self.plays = []
+        for bit, (rule, zone, card, ending) in enumerate(rules):
+            bits = self.handBits if zone == "hand" else self.fieldBits
+            bits[card] = bits.get(card, 0) | 1 << bit
+            self.plays.append((rule, "rule" + "".join(word.capitalize() for word in rule.split()), card, ending))
+
+    def rules(self, hand, battlefield) -> int:
+        """Returns the bits of the rules triggered by the cards in `hand` and `battlefield`."""
+        bits = 0
+        handBits = self.handBits
+        for card in hand:
+            bits |= handBits.get(card, 0)
+        fieldBits = self.fieldBits
+        for card in battlefield:
+            bits |= fieldBits.get(card, 0)
+        return bits
+
+obviousPolicy = rulePolicy(obviousRules)
+priorityPolicy = rulePolicy(priorityRules)
+
+# What `manaBound` counts each card as, by card id: the most mana it makes by
+# itself, and how many cards into the library it digs for free (paying back
+# what it costs) or for mana. No card digs for less than a mana a `digRate`
+# cards, and every mana of energytap or offering comes from a creature.
+cardMana = [0] * (max(cardLookupDict) + 1)
+freeDigs = [0] * (max(cardLookupDict) + 1)
+paidDigs = [0] * (max(cardLookupDict) + 1)
+for card in basics:
+    cardMana[card] = 1
+cardMana[petal] = 1
+cardMana[ritual] = 2
+freeDigs[wraith] = freeDigs[manamorphose] = 1
+paidDigs[star] = paidDigs[sphere] = 1
+paidDigs[looting] = 2
+paidDigs[ponder] = paidDigs[preordain] = paidDigs[visions] = 3
+paidDigs[knowledge] = max(manaValues[card] for card in cardsOfType("creature"))
+cardMana, freeDigs, paidDigs = tuple(cardMana), tuple(freeDigs), tuple(paidDigs)
+digRate = 3
+
+# The creatures energytap and offering make mana from, and the most they make
+delveCreatures = [attendants, gurmangler]
+creatureMana = max(manaValues[card] for card in delveCreatures)
+
+def manaCeiling(made: int, taps: int, offers: int, toCast: int, onField: int, onTapped: int) -> int:
+    """Returns the most mana `made` mana and the rest of a turn's cards could
+    come to, with `taps` energytaps and `offers` offerings to make mana from
+    `onField` untapped and `onTapped` tapped creatures and `toCast` more."""
+    # A creature can be tapped by energytap and then sacrificed to offering,
+    # each for its mana value less the spell's one, and one still to be cast
+    # costs at least another mana
+    taps = min(taps, onField + toCast)
+    offers = min(offers, onField + onTapped + toCast)
+    cast = max(0, taps - onField, offers - onField - onTapped)
+    return made + (creatureMana - 1) * (taps + offers) - cast
+
+# What kaervek needs to win: 21 mana, one of it red
+winMana = 21
+
 
 library = []
 hand = []
@@ -152,29 +321,61 @@ graveyard = []
 battlefield = []
 
 class game():
-    """Start a new goldfishing game with the given deck."""
-
-    def __init__(self, deck: list, verbose = False):
-        self.library = deepcopy(deck)
-        random.shuffle(self.library)
+    """Start a new goldfishing game with the given deck.
+
+    Shuffles come from `rng`, the global `random` module unless given. Pass a
+    `ruleProfile` as `profile` to count the rules `go` plays, and a `gameLog`
+    as `log` to record what happens for `gamelog.render` to tell later.
+
+    Once a game is over, `reset` starts the next one with the same deck,
+    reusing its zones rather than making a new game. `snapshot` takes its
+    position, to fork games from that play on from it.
+
+    The library is kept top card last, so drawing a card and putting one on
+    top are a pop and an append at its end, and its length is the top cursor.
+    Only putting a card on the bottom moves the rest."""
+
+    __slots__ = ["rng", "profile", "log", "deck", "library", "hand", "graveyard", "battlefield", "tapped",
+                 "floating", "storm", "turn", "verbose", "policy"]
+
+    # Cards the rules go through in order, from `cardTable`; a card's kind is
+    # otherwise checked with `cardFlags`
+    lands = cardsOfType("land")
+    creatures = cardsOfType("creature")
+    untappedLands = [card for card in lands if card not in cardsOfKind("enters tapped")]
+    tappedLands = [skerry, vent, spring] # in the order they are played
+
+    # Whether `go` gives up on a turn once `manaBound` shows it can no longer
+    # win. Games end the same either way, but on the decks here working the
+    # bound out every loop costs more than the loops it saves, so it is off
+    # unless asked for, by playing `giveUpGame` (main.py --give-up).
+    giveUp = False
+
+    def __init__(self, deck: list, verbose = False, rng = random, profile = None, log = None):
+        self.deck = deck
+        self.profile = profile
+        self.verbose = verbose
+        self.policy = priorityPolicy
+        self.library = []
         self.hand = []
         self.graveyard = []
         self.battlefield = []
         self.tapped = []
 
+        self.reset(rng, log)
+
+    def reset(self, rng = random, log = None) -> None:
+        """Starts a new game with the same deck, shuffled by `rng` and logged to `log`.
+
+        The library is refilled from the deck and the other zones emptied in place."""
+        self.rng = rng
+        self.log = log
+        self.library[:] = self.deck
+        self.clearZones()
+
         self.floating = [0, 0, 0, 0, 0, 0] # WUBRG colourless
         self.storm = 0
         self.turn = 0
-        self.verbose = verbose
-
-        self.lands = [plains, island, swamp, mountain, forest, spring, skerry, vent]
-        self.creatures = [gurmangler, attendants, wraith]
-        self.artefacts = [star, petal, sphere]
-        self.easydraw = [manamorphose, ponder, preordain, star, sphere, looting, visions]
-        self.untappedLands = [plains, island, swamp, mountain, forest]
-        self.tappedLands = [skerry, vent, spring]
-        self.earlyPlays = [star, sphere]
-        self.filtering = [star, sphere, manamorphose, petal]
 
         if self.verbose:
             print("# NEW GAME")
@@ -182,7 +383,28 @@ class game():
 
         self.mulligan()
 
+    def snapshot(self, replay = True) -> "gameSnapshot":
+        """Returns the game's position for `gameSnapshot.fork` to play on
+        from, and with `replay` a copy of its random stream, for forks that
+        are not given one. The game is left as it is."""
+        state = []
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", []):
+                if name not in gameSnapshot.unshared:
+                    value = getattr(self, name)
+                    state.append((name, tuple(value) if type(value) is list else value))
+        return gameSnapshot(type(self), self.deck, cloneRng(self.rng) if replay else None, tuple(state))
+
+    def clearZones(self) -> None:
+        """Empties the hand, graveyard, battlefield and tapped permanents."""
+        self.hand.clear()
+        self.graveyard.clear()
+        self.battlefield.clear()
+        self.tapped.clear()
+
     def state(self, full = False) -> None:
+        if self.log is not None:
+            self.log.mana(self.floating, self.storm)
         if self.verbose:
             print(Style.RESET_ALL + Style.DIM + "Tu " + Style.RESET_ALL + Fore.CYAN + f"{self.turn} " +
                 Style.RESET_ALL + Style.DIM + "Ha " + Style.RESET_ALL + Fore.CYAN + f"{len(self.hand)} " +
@@ -200,6 +422,8 @@ class game():
                 print(Style.RESET_ALL + Style.DIM + "  yard   " + Style.RESET_ALL + Fore.CYAN + str(self.lookUpNames(self.graveyard)) + Style.RESET_ALL)
             
     def stateTurn(self) -> None:
+        if self.log is not None:
+            self.log.turn(self.turn)
         if self.verbose:
             print(f"\n# TURN {self.turn}")
 
@@ -208,10 +432,14 @@ class game():
         return [cardLookupDict.get(i, str(i)) for i in l]
 
     def win(self, bywhat) -> None:
+        if self.log is not None:
+            self.log.win(bywhat)
         if self.verbose:
             print(f"WON BY {bywhat}!")
 
     def lose(self) -> None:
+        if self.log is not None:
+            self.log.lose()
         if self.verbose:
             self.state()
             print("LOST :(")
@@ -220,50 +448,56 @@ class game():
         """Draw `n` cards."""
 
         if self.verbose:
-            drawn = self.library[0:n]
+            drawn = self.library[:-n - 1:-1]
             print(Style.RESET_ALL + Style.DIM + "draws " + Style.RESET_ALL + Fore.CYAN + str(self.lookUpNames(drawn)) + Style.RESET_ALL)
 
         for _ in range (0, n):
             if len(self.library) == 0:
                 self.lose()
                 break
-            self.hand.append(self.library.pop(0))
+            self.hand.append(self.library.pop())
+            if self.log is not None:
+                self.log.draw(self.hand[-1])
 
     def scry(self, n: int) -> None:
         """Scrys `n` cards."""
         if len(self.library) < n:
             self.lose()
-        peek = self.library[0:n]
+        peek = self.library[:-n - 1:-1]
+        del self.library[-n:]
 
         bottom = []
         top = []
 
-        bad = self.tappedLands
-        good = [kaervek]
+        wantCreatures = self.numberOfKind(CREATURE, self.hand) <= 0
+        wantFiltering = self.numberOfKind(FILTERING, self.hand) + self.numberOfKind(FILTERING, self.battlefield) <= 2
+        wantDraw = self.numberOfKind(EASYDRAW, self.hand) <= 1
+        wantKnowledge = self.numberOfKind(DRAW_SPELL, self.hand) <= 0 and sum(self.floating) > 5
+        wantLand = self.numberOfKind(UNTAPPED_LAND, self.hand) + self.numberOfKind(UNTAPPED_LAND, self.tapped) <= 0
 
-        wantCreatures = self.numberOf(self.creatures, self.hand) <= 0
-        wantFiltering = self.numberOf(self.filtering, self.hand) + self.numberOf(self.filtering, self.battlefield) <= 2
-        wantDraw = self.numberOf(self.easydraw, self.hand) <= 1
-        wantKnowledge = self.numberOf([knowledge, brainspoil], self.hand) <= 0 and sum(self.floating) > 5
-        wantLand = self.numberOf(self.untappedLands, self.hand) + self.numberOf(self.untappedLands, self.tapped) <= 0
+        # Kinds of card wanted on top
+        wanted = (wantCreatures or wantFiltering) * CREATURE | wantDraw * EASYDRAW | wantKnowledge * DRAW_SPELL | wantLand * UNTAPPED_LAND
 
         for card in peek:
-            if card in good:
+            flags = cardFlags[card]
+            if card == kaervek:
                 top.append(card)
-            elif card in bad:
+            elif flags & TAPPED_LAND:
                 bottom.append(card)
 
-            elif (wantCreatures and card in self.creatures) or (wantFiltering and card in self.creatures) or (wantDraw and card in self.easydraw) or (wantKnowledge and card in [knowledge, brainspoil]) or (wantLand and card in self.untappedLands):
+            elif flags & wanted:
                 top.append(card)
             
             else:
                 bottom.append(card)
             
         for card in bottom:
-            library.append(card)
+            self.library.insert(0, card)
         for card in top:
-            library.insert(0, card)
+            self.library.append(card)
 
+        if self.log is not None:
+            self.log.scry(top, bottom)
         if self.verbose:
             print(Style.RESET_ALL + Style.DIM + "scrys " + Style.RESET_ALL + Fore.CYAN + f"{self.lookUpNames(top)} top, {self.lookUpNames(bottom)} bottom" + Style.RESET_ALL)
 
@@ -273,33 +507,51 @@ class game():
             print(Style.RESET_ALL + Style.DIM + "discards " + Style.RESET_ALL + Fore.CYAN + str(n) + Style.RESET_ALL)
         for _ in range(0, n):
             # check for lands in hand
-            handLands = [card for card in self.hand if card in self.lands]
-            handCreatures = [card for card in self.hand if card in self.creatures]
+            handLands = [card for card in self.hand if cardFlags[card] & LAND]
+            handCreatures = [card for card in self.hand if cardFlags[card] & CREATURE]
             if len(handLands) > 0:
                 self.graveyard.append(self.hand.pop(self.hand.index(handLands[0])))
             elif len(handCreatures) > 1:
                 self.graveyard.append(self.hand.pop(self.hand.index(handCreatures[0])))
             elif len(self.hand) > 0:
                 self.graveyard.append(self.hand.pop(0))
+            else:
+                continue
+            if self.log is not None:
+                self.log.discard(self.graveyard[-1])
                 
+    def searchLibrary(self, card) -> None:
+        """Takes the topmost copy of `card` out of the library."""
+        for i in range(len(self.library) - 1, -1, -1):
+            if self.library[i] == card:
+                del self.library[i]
+                return
+
+    def shuffleLibrary(self) -> None:
+        """Shuffles the library.
+
+        It is turned top card first to be shuffled, so a seeded shuffle puts
+        the cards in the same order as one of a library kept top card first."""
+        self.library.reverse()
+        self.rng.shuffle(self.library)
+        self.library.reverse()
+        if self.log is not None:
+            self.log.shuffle(self.library[::-1])
+
     def mulligan(self) -> None:
-        """Draw hands and mulligan until we have a good enough hand."""
+        """Draw hands and mulligan until we have a good enough hand.
 
-        for n in [7,6,5,4]:
-            
-            for card in self.hand:
-                self.library.append(card)
-            
-            random.shuffle(self.library)
+        The hand kept is dealt straight from its exact odds by `dealOpening`
+        rather than by drawing and reshuffling until one is good enough."""
+        from openings import dealOpening
 
-            # empty hand then draw n
-            self.hand = []
-            self.draw(n)
+        self.hand = dealOpening(self.library, self.rng)
+        self.library.reverse()
 
-            nLands = self.numberOf(self.lands, self.hand)
-            nDraw = self.numberOf(self.easydraw, self.hand)
-            if (nLands >= 2 and nLands < 5 and nDraw >= 1) or (n <= 5 and nLands >= 2):
-                break
+        if self.log is not None:
+            self.log.deal(self.hand, self.library[::-1])
+        if self.verbose:
+            print(Style.RESET_ALL + Style.DIM + "keeps " + Style.RESET_ALL + Fore.CYAN + str(self.lookUpNames(self.hand)) + Style.RESET_ALL)
 
     def firstTurns(self) -> None:
         """Play the first 3.5 turns of the game.
@@ -310,20 +562,20 @@ class game():
             self.turn = i
             self.clearForNewTurn()
 
+            self.stateTurn()
             if self.verbose:
-                self.stateTurn()
                 self.state(True)  
 
             if self.turn != 1:
                 self.draw(1)
 
-            if self.numberOf(self.lands, self.hand) > 0:
+            if self.numberOfKind(LAND, self.hand) > 0:
                self.playLand()
 
             # Play stars and spheres on turn 3
             if self.turn == 3:
                 self.tapLands()
-                if self.numberOf([star, sphere], self.hand) > 0:
+                if self.numberOfKind(EARLY_PLAY, self.hand) > 0:
                     self.playStars()
             
             self.state()
@@ -336,279 +588,358 @@ class game():
         self.draw(1)
 
     def go(self) -> bool:
-        """Attempts to combo off and returns a bool based on whether it won."""
+        """Attempts to combo off and returns a bool based on whether it won.
+
+        Each loop makes an obvious play if there is one (see `obviousRules`),
+        or else the first of `priorityRules` that can be played. With
+        `giveUp`, a loop first loses the game, as doomed, if `manaBound` is
+        short of what kaervek needs.
+
+        With a `profile`, records which rule each loop plays and how the game ends."""
         
         # First make mana
         self.tapSacLands()
 
-        playedALand = False
+        profile = self.profile
+        loops = 0
 
         # Loop forever until we win or can't play anything.
         while True:
 
-            playedSomething = False
+            loops += 1
+            if profile is not None:
+                start = time.perf_counter()
 
             if len(self.library) == 0:
                 self.lose()
+                if profile is not None:
+                    profile.record("decked", start, "decked", loops)
                 return False
 
-            # Make obvious plays
-            for i in range(0, len(self.hand)):
-
-                if playedSomething:
-                    self.state()
-                    break
-                
-                # Kaervek's touch to win the game
-                if self.hand[i] == kaervek:
-                    if self.floating[R] >= 1 and sum(self.floating) >= 21:
-                        self.spend(20, 0, 0, 0, 1, 0)
-                        self.playNonPermanent(i)
-                        self.state()
-                        self.win(kaervek)
-                        playedSomething = True
-                        return True
-
-                # Petals
-                elif self.hand[i] == petal:
-                    self.playPermanent(i)
-                    playedSomething = True
-                
-                # Rituals
-                elif self.hand[i] == ritual:
-                    if self.floating[B] >= 1:
-
-                        # effect
-                        self.floating[B] += 2 # -1 +3
-                        
-                        self.playNonPermanent(i)
-                        playedSomething = True
-
-                elif self.hand[i] == wraith:
-                    # cycle wraith
-                    self.storm -= 1
-                    self.playNonPermanent(i)
-
-                    self.draw(1)
-
-                    playedSomething = True
-
-                # Try to play an untapped land if we haven't already
-                elif (not playedALand) and self.hand[i] in self.untappedLands:
-                    playedSomething = self.playKindOfLand(self.untappedLands)
-
-                    self.tapBasics()
-                
-                
-            # Now that we've made all the obvious plays,
-            # here're the rest of our priorities:
-            #    1. PLAY DELVE CREATURE
-            #    2. GENERATE MANA
-            #    3. DRAW CARDS
-            #    4. DIG
-            
-            if not playedSomething:
-
-                # Delve for creature
-                if len(self.graveyard) >= 7 and attendants in self.hand and (self.floating[B] >= 1):
-                    i = self.hand.index(attendants)
-
-                    self.spend(max(0, 7-len(self.graveyard)),0,0,1)
-                    self.delve(min(7, len(self.graveyard)))
-
-                    self.playPermanent(i)
-                    playedSomething = True
-                            
-                elif len(self.graveyard) >= 6 and gurmangler in self.hand and self.floating[B] >= 1:
-                    i = self.hand.index(gurmangler)
-
-                    self.spend(max(0, 6-len(self.graveyard)),0,0,1)
-                    self.delve(min(6, len(self.graveyard)))
-
-                    self.playPermanent(i)
-                    playedSomething = True
-
-                # Make mana
-                elif petal in self.battlefield:
-                    i = self.battlefield.index(petal)
-
-                    self.make(1)
-                    self.sac(i)
+            # Give up once kaervek can't be reached or paid for however we play
+            if self.giveUp and self.manaBound() < winMana:
+                self.lose()
+                if profile is not None:
+                    profile.record("doomed", start, "doomed", loops)
+                return False
 
-                    playedSomething = True
-                
-                elif energytap in self.hand and self.floating[U] >= 1 and self.maxCMCon(self.battlefield) >= 7:
-                    spell = self.hand.index(energytap)
-                    creature = self.battlefield.index(attendants) if attendants in self.battlefield else self.battlefield.index(gurmangler)
+            # Make obvious plays
+            play = self.obviousPlay()
+            if play is not None:
+                self.state()
 
-                    self.spend(0, 0, 1)
-                    self.floating[colorless] += self.maxCMCon(self.battlefield)
-                    
-                    self.tap(creature)
-                    self.playNonPermanent(spell)
+            # Now that we've made all the obvious plays, play by priority
+            else:
+                play = self.priorityPlay()
+                self.state(True)
 
-                    playedSomething = True
-                
-                elif offering in self.hand and self.floating[B] >= 1 and (self.maxCMCon(self.battlefield) >= 7 or self.maxCMCon(self.tapped) >= 7):
-                    spell = self.hand.index(offering)
-                    creature = -1
-                    tapped = False
-
-                    if attendants in self.tapped:
-                        creature = self.tapped.index(attendants)
-                        tapped = True
-                    elif gurmangler in self.tapped:
-                        creature = self.tapped.index(gurmangler)
-                        tapped = True
-                    elif attendants in self.battlefield:
-                        creature = self.battlefield.index(attendants)
-                    elif gurmangler in self.battlefield:
-                        creature = self.battlefield.index(gurmangler)
-
-                    if tapped:
-                        self.spend(0, 0, 0, 1)
-                        self.make(self.maxCMCon(self.tapped), False, False, True, True, False)
-
-                        self.sac(creature, True)
-                        self.statePlayFromHand(spell)
-                        self.playNonPermanent(spell)
-                    else:
-                        self.spend(0, 0, 0, 1)
-                        self.make(self.maxCMCon(self.battlefield), False, False, True, True, False)
-                    
-                        self.sac(creature)
-                        self.playNonPermanent(spell)
+            rule, _, card, ending = play if play is not None else ("stuck", None, None, "stuck")
+            if ending == "won":
+                self.win(card)
+                if profile is not None:
+                    profile.record(rule, start, "won", loops)
+                return True
 
-                    playedSomething = True
+            # if we don't play anything from our hand, lose!
+            if ending == "stuck":
+                self.lose()
+                if profile is not None:
+                    profile.record(rule, start, "stuck", loops)
+                return False
 
-                # Filter mana
-                elif star in self.battlefield and sum(self.floating) >= 1 and len(self.library) > 0:
-                    i = self.battlefield.index(star)
+            if profile is not None:
+                profile.record(rule, start)
+
+    def obviousPlay(self):
+        """Makes the obvious play of the first card in the hand that has one,
+        and returns its play from `obviousPolicy`, or None if there is none."""
+        plays = obviousPolicy.plays
+        handBits = obviousPolicy.handBits
+        for card in self.hand:
+            bits = handBits.get(card)
+            if bits is not None:
+                play = plays[bits.bit_length() - 1]
+                if getattr(self, play[1])():
+                    return play
+        return None
+
+    def priorityPlay(self):
+        """Plays the first of `policy`'s rules it can, trying only those whose
+        card is in place, and returns its play, or None."""
+        plays = self.policy.plays
+        bits = self.triggeredRules()
+        while bits:
+            bit = bits & -bits
+            play = plays[bit.bit_length() - 1]
+            if getattr(self, play[1])():
+                return play
+            bits ^= bit
+        return None
+
+    def triggeredRules(self) -> int:
+        """Returns the bits of the `policy` rules triggered by the cards in play."""
+        return self.policy.rules(self.hand, self.battlefield)
+
+    def manaBound(self) -> int:
+        """Returns an upper bound on the mana the turn could have at once from
+        here, or -1 if kaervek is out of reach.
+
+        The cards in reach are the hand and as far into the library as they
+        and the cards they find could dig, all of it once one is brainspoil.
+        Each counts as making the most mana it could, less a mana a `digRate`
+        cards dug to find kaervek past what free digging reaches."""
+        hand, battlefield, tapped, library = self.hand, self.battlefield, self.tapped, self.library
+        free = battlefield.count(star) + battlefield.count(sphere) + sum(map(freeDigs.__getitem__, hand))
+        depth = free + sum(map(paidDigs.__getitem__, hand))
+        seen = cost = 0
+        found = kaervek in hand
+        for card in reversed(library):
+            if seen >= depth:
+                break
+            seen += 1
+            free += freeDigs[card]
+            depth += freeDigs[card] + paidDigs[card]
+            if card == kaervek and not found:
+                found = True
+                cost = max(0, seen - free + digRate - 1) // digRate
+        dug = library[len(library) - seen:]
+        cards = hand + (library if brainspoil in hand or brainspoil in dug else dug)
+        if kaervek not in cards:
+            return -1
+
+        made = sum(self.floating) + battlefield.count(petal) + sum(map(cardMana.__getitem__, cards)) - cost
+        onField = battlefield.count(attendants) + battlefield.count(gurmangler)
+        onTapped = tapped.count(attendants) + tapped.count(gurmangler)
+        return manaCeiling(made, cards.count(energytap), cards.count(offering),
+                           cards.count(attendants) + cards.count(gurmangler), onField, onTapped)
+
+    # Kaervek's touch to win the game
+    def ruleKaervek(self) -> bool:
+        if self.floating[R] >= 1 and sum(self.floating) >= 21:
+            self.spend(20, 0, 0, 0, 1, 0)
+            self.playNonPermanent(self.hand.index(kaervek))
+            return True
+        return False
 
-                    self.spend(1)
-                    self.make(1)
-                    self.sac(i)
-                    self.draw(1)
+    def rulePetal(self) -> bool:
+        self.playPermanent(self.hand.index(petal))
+        return True
 
-                    playedSomething = True
+    def ruleRitual(self) -> bool:
+        if self.floating[B] >= 1:
+            # effect
+            self.floating[B] += 2 # -1 +3
+            self.playNonPermanent(self.hand.index(ritual))
+            return True
+        return False
 
-                elif sphere in self.battlefield and sum(self.floating) >= 1 and len(self.library) > 0:
-                    i = self.battlefield.index(sphere)
+    def ruleWraith(self) -> bool:
+        # cycle wraith
+        self.storm -= 1
+        self.playNonPermanent(self.hand.index(wraith))
+        self.draw(1)
+        return True
 
-                    self.spend(1)
-                    self.make(1)
-                    self.draw(1)
-                    self.sac(i)
+    # Play an untapped land
+    def ruleLand(self) -> bool:
+        played = self.playKindOfLand(self.untappedLands)
+        self.tapBasics()
+        return played
 
-                    playedSomething = True
+    # Delve for creature
+    def ruleAttendants(self) -> bool:
+        if len(self.graveyard) >= 7 and self.floating[B] >= 1:
+            i = self.hand.index(attendants)
 
-                elif star in self.hand and sum(self.floating) >= 2 and len(self.library) > 0:
-                    i = self.hand.index(star)
+            self.spend(max(0, 7-len(self.graveyard)),0,0,1)
+            self.delve(min(7, len(self.graveyard)))
 
-                    self.spend(1)
-                    self.playPermanent(i)
+            self.playPermanent(i)
+            return True
+        return False
 
-                    playedSomething = True
+    def ruleGurmangler(self) -> bool:
+        if len(self.graveyard) >= 6 and self.floating[B] >= 1:
+            i = self.hand.index(gurmangler)
 
-                elif sphere in self.hand and sum(self.floating) >= 2 and len(self.library) > 0:
-                    i = self.hand.index(sphere)
+            self.spend(max(0, 6-len(self.graveyard)),0,0,1)
+            self.delve(min(6, len(self.graveyard)))
 
-                    self.spend(1)
-                    self.playPermanent(i)
+            self.playPermanent(i)
+            return True
+        return False
 
-                    playedSomething = True
-                
-                elif manamorphose in self.hand and self.floating[R] >= 1 and sum(self.floating) >= 2 and len(self.library) > 0:
-                    i = self.hand.index(manamorphose)
+    # Make mana
+    def rulePetalMana(self) -> bool:
+        i = self.battlefield.index(petal)
 
-                    self.spend(1, 0, 0, 0, 1)
-                    self.make(2)
-                    self.draw(1)
+        self.make(1)
+        self.sac(i)
+        return True
 
-                    self.playNonPermanent(i)
+    def ruleEnergytap(self) -> bool:
+        if self.floating[U] >= 1 and self.maxCMCon(self.battlefield) >= 7:
+            spell = self.hand.index(energytap)
+            creature = self.battlefield.index(attendants) if attendants in self.battlefield else self.battlefield.index(gurmangler)
 
-                    playedSomething = True
+            self.spend(0, 0, 1)
+            self.floating[colorless] += self.maxCMCon(self.battlefield)
 
-                # Draw cards
-                elif (knowledge in self.hand) and (sum(self.floating) >= 7 and self.floating[B] >= 1) and (self.numberOf(self.creatures, self.battlefield) + self.numberOf(self.creatures, self.tapped) >= 1) and len(self.library) >= self.maxCMCon(self.battlefield):
-                    i = self.hand.index(knowledge)
+            self.tap(creature)
+            self.playNonPermanent(spell)
+            return True
+        return False
 
-                    self.spend(4, 0, 1)
-                    self.playNonPermanent(i)
-                    # effect
-                    cmc = max(self.maxCMCon(self.battlefield), self.maxCMCon(self.tapped))
-                    self.draw(cmc)
+    def ruleOffering(self) -> bool:
+        if self.floating[B] >= 1 and (self.maxCMCon(self.battlefield) >= 7 or self.maxCMCon(self.tapped) >= 7):
+            spell = self.hand.index(offering)
+            creature = -1
+            tapped = False
+
+            if attendants in self.tapped:
+                creature = self.tapped.index(attendants)
+                tapped = True
+            elif gurmangler in self.tapped:
+                creature = self.tapped.index(gurmangler)
+                tapped = True
+            elif attendants in self.battlefield:
+                creature = self.battlefield.index(attendants)
+            elif gurmangler in self.battlefield:
+                creature = self.battlefield.index(gurmangler)
+
+            if tapped:
+                self.spend(0, 0, 0, 1)
+                self.make(self.maxCMCon(self.tapped), False, False, True, True, False)
+
+                self.sac(creature, True)
+                self.statePlayFromHand(spell)
+                self.playNonPermanent(spell)
+            else:
+                self.spend(0, 0, 0, 1)
+                self.make(self.maxCMCon(self.battlefield), False, False, True, True, False)
 
-                    playedSomething = True
+                self.sac(creature)
+                self.playNonPermanent(spell)
+            return True
+        return False
 
-                elif brainspoil in self.hand and self.floating[B] >= 2 and self.floating[U] >= 1 and sum(self.floating) >= 10 and self.library.count(knowledge) > 0 and len(self.library) > self.maxCMCon(self.battlefield):
-                    i = self.hand.index(brainspoil)
-                    # account for increase of storm (it shouldn't increase)
-                    self.storm -= 1
-                    self.playNonPermanent(i)
+    # Filter mana
+    def ruleStarMana(self) -> bool:
+        if sum(self.floating) >= 1 and len(self.library) > 0:
+            i = self.battlefield.index(star)
 
-                    self.spend(1, 0, 0, 2)
+            self.spend(1)
+            self.make(1)
+            self.sac(i)
+            self.draw(1)
+            return True
+        return False
 
-                    self.library.pop(self.library.index(knowledge))
-                    self.hand.append(knowledge)
-                    random.shuffle(self.library)
+    def ruleSphereMana(self) -> bool:
+        if sum(self.floating) >= 1 and len(self.library) > 0:
+            i = self.battlefield.index(sphere)
 
-                    playedSomething = True
+            self.spend(1)
+            self.make(1)
+            self.draw(1)
+            self.sac(i)
+            return True
+        return False
 
-                # Dig for cards
-                elif ponder in self.hand and self.floating[U] >= 1 and len(self.library) > 2: 
-                    i = self.hand.index(ponder)
+    def ruleStar(self) -> bool:
+        if sum(self.floating) >= 2 and len(self.library) > 0:
+            self.spend(1)
+            self.playPermanent(self.hand.index(star))
+            return True
+        return False
 
-                    # approximate ponder as scry 2
-                    self.spend(0,0,1)
-                    self.playNonPermanent(i)
+    def ruleSphere(self) -> bool:
+        if sum(self.floating) >= 2 and len(self.library) > 0:
+            self.spend(1)
+            self.playPermanent(self.hand.index(sphere))
+            return True
+        return False
 
-                    self.scry(2)
-                    self.draw(1)
+    def ruleManamorphose(self) -> bool:
+        if self.floating[R] >= 1 and sum(self.floating) >= 2 and len(self.library) > 0:
+            i = self.hand.index(manamorphose)
 
+            self.spend(1, 0, 0, 0, 1)
+            self.make(2)
+            self.draw(1)
 
-                    playedSomething = True
-                
-                elif preordain in self.hand and self.floating[U] >= 1 and len(self.library) > 1:
-                    i = self.hand.index(preordain)
+            self.playNonPermanent(i)
+            return True
+        return False
 
-                    # approximate ponder as scry 2
-                    self.spend(0,0,1)
-                    self.playNonPermanent(i)
+    # Draw cards
+    def ruleKnowledge(self) -> bool:
+        if (sum(self.floating) >= 7 and self.floating[B] >= 1) and (self.numberOfKind(CREATURE, self.battlefield) + self.numberOfKind(CREATURE, self.tapped) >= 1) and len(self.library) >= self.maxCMCon(self.battlefield):
+            self.spend(4, 0, 1)
+            self.playNonPermanent(self.hand.index(knowledge))
+            # effect
+            cmc = max(self.maxCMCon(self.battlefield), self.maxCMCon(self.tapped))
+            self.draw(cmc)
+            return True
+        return False
 
-                    self.scry(2)
-                    self.draw(1)
+    def ruleBrainspoil(self) -> bool:
+        if self.floating[B] >= 2 and self.floating[U] >= 1 and sum(self.floating) >= 10 and self.library.count(knowledge) > 0 and len(self.library) > self.maxCMCon(self.battlefield):
+            # account for increase of storm (it shouldn't increase)
+            self.storm -= 1
+            self.playNonPermanent(self.hand.index(brainspoil))
 
-                    playedSomething = True
+            self.spend(1, 0, 0, 2)
 
-                elif looting in self.hand and self.floating[R] >= 1 and len(self.library) > 1:
-                    i = self.hand.index(looting)
+            self.searchLibrary(knowledge)
+            self.hand.append(knowledge)
+            if self.log is not None:
+                self.log.tutor(knowledge)
+            self.shuffleLibrary()
+            return True
+        return False
 
-                    self.spend(0,0,0,0,1)
-                    self.playNonPermanent(i)
+    # Dig for cards
+    def rulePonder(self) -> bool:
+        if self.floating[U] >= 1 and len(self.library) > 2:
+            # approximate ponder as scry 2
+            self.spend(0,0,1)
+            self.playNonPermanent(self.hand.index(ponder))
 
-                    self.draw(2)
-                    self.discard(2)
+            self.scry(2)
+            self.draw(1)
+            return True
+        return False
 
-                elif visions in self.hand and self.floating[U] >= 1 and len(self.library) > 2:
-                    i = self.hand.index(visions)
+    def rulePreordain(self) -> bool:
+        if self.floating[U] >= 1 and len(self.library) > 1:
+            self.spend(0,0,1)
+            self.playNonPermanent(self.hand.index(preordain))
 
-                    # approximate ponder as scry 2
-                    self.spend(0,0,1)
-                    self.playNonPermanent(i)
+            self.scry(2)
+            self.draw(1)
+            return True
+        return False
 
-                    self.draw(1)
-                    self.scry(2)
+    def ruleLooting(self) -> bool:
+        if self.floating[R] >= 1 and len(self.library) > 1:
+            self.spend(0,0,0,0,1)
+            self.playNonPermanent(self.hand.index(looting))
 
-                    playedSomething = True
+            self.draw(2)
+            self.discard(2)
+            return True
+        return False
 
+    def ruleVisions(self) -> bool:
+        if self.floating[U] >= 1 and len(self.library) > 2:
+            self.spend(0,0,1)
+            self.playNonPermanent(self.hand.index(visions))
 
-                self.state(True)
-            
-            # if we don't play anything from our hand, lose!
-            if not playedSomething:
-                self.lose()
-                return False
+            self.draw(1)
+            self.scry(2)
+            return True
+        return False
 
     def playLand(self) -> bool:
         """Plays a land.
@@ -625,13 +956,16 @@ class game():
             return self.playKindOfLand(self.untappedLands)
     
     def playKindOfLand(self, landList) -> bool:
-        """Plays the first land in the hand which is in the given list."""
-        for i in range(0, len(self.hand)):
-                if self.hand[i] in landList:
+        """Plays a land from the hand, preferring lands earlier in the given list."""
+        for land in landList:
+                if land in self.hand:
+                    i = self.hand.index(land)
 
                     self.statePlayFromHand(i)
+                    if self.log is not None:
+                        self.log.land(land)
 
-                    if self.hand[i] in self.untappedLands:
+                    if cardFlags[land] & UNTAPPED_LAND:
                         self.battlefield.append(self.hand.pop(i))
                     else:
                         self.tapped.append(self.hand.pop(i))
@@ -642,12 +976,14 @@ class game():
     def playStars(self) -> None:
         """Plays stars and spheres on turn 3."""
         # Loop to make sure we catch them all.
-        for _ in range(0, self.numberOf(self.artefacts, self.hand)):
+        for _ in range(0, self.numberOfKind(ARTEFACT, self.hand)):
             for i in range(0, len(self.hand)):
                 # If we have mana
                 if sum(self.floating) > 0:
                     if self.hand[i] == star:
                         self.statePlayFromHand(i)
+                        if self.log is not None:
+                            self.log.play(star)
                         self.battlefield.append(self.hand.pop(i))
                         self.storm += 1
                         # Use the mana
@@ -662,7 +998,7 @@ class game():
         self.tapBasics()
         for _ in range(4):
             for i in range(0, len(self.battlefield)):
-                if self.battlefield[i] in self.tappedLands:
+                if cardFlags[self.battlefield[i]] & TAPPED_LAND:
 
                     if self.battlefield[i] == spring:
                         self.floating[1] += 1
@@ -680,64 +1016,32 @@ class game():
         """Taps and sacs lands for mana (on turn 4)."""
         self.tapBasics()
         # loop to catch them all
-        for _ in range(0, self.numberOf(self.tappedLands, self.battlefield)):
+        for _ in range(0, self.numberOfKind(TAPPED_LAND, self.battlefield)):
             for i in range(0, len(self.battlefield)):
-                if self.battlefield[i] in self.tappedLands:
+                if cardFlags[self.battlefield[i]] & TAPPED_LAND:
 
                     # Check what it is and add appropriate mana.
-                    if self.battlefield[i] == spring:
-                        self.floating[W] += 1
-                        self.floating[B] += 1
-                        self.sac(i)
-                        break
-                    elif self.battlefield[i] == skerry:
-                        self.floating[U] += 2
-                        self.sac(i)
-                        break
-                    elif self.battlefield[i] == vent:
-                        self.floating[U] += 1
-                        self.floating[R] += 1
-                        self.sac(i)
-                        break
+                    for colour, n in enumerate(landMana[self.battlefield[i]]):
+                        self.floating[colour] += n
+                    self.sac(i)
+                    break
         
         self.state()
 
     def tapBasics(self) -> None:
-        for card in self.battlefield:
-            if card in self.untappedLands:
-
-                y = False
-                if card == plains:
-                    self.floating[0] += 1
-                    y = True
-                elif card == island:
-                    self.floating[1] += 1
-                    y = True
-                elif card == swamp:
-                    self.floating[2] += 1
-                    y = True
-                elif card == mountain:
-                    self.floating[3] += 1
-                    y = True
-                elif card == forest:
-                    self.floating[4] += 1
-                    y = True
-
-                if y:
-                    self.tapped.append(self.battlefield.pop(self.battlefield.index(card)))
-
-    def numberOf(self, seek: list, items: list) -> int:
-        """Counts the number of things in `seek` in `items`."""
-
-        number = 0
-        for l in seek:
-            number += items.count(l)
-        
-        return number
+        for card in list(self.battlefield):
+            if cardFlags[card] & UNTAPPED_LAND:
+                for colour, n in enumerate(landMana[card]):
+                    self.floating[colour] += n
+                self.tapped.append(self.battlefield.pop(self.battlefield.index(card)))
+
+    def numberOfKind(self, flag: int, items: list) -> int:
+        """Counts the cards of kind `flag` in `items`."""
+        return sum([1 for card in items if cardFlags[card] & flag])
     
     def numberOfSpells(self) -> int:
         """Shortcut function to return the number of spells in hand."""
-        return len(self.hand) - self.numberOf(self.lands, self.hand)
+        return len(self.hand) - self.numberOfKind(LAND, self.hand)
 
     def clearForNewTurn(self) -> None:
         """Resets for new turn."""
@@ -748,6 +1052,8 @@ class game():
     
     def sac(self, i: int, tapped = False) -> None:
         """Sacs element i from the battlefield and adds it to the graveyard."""
+        if self.log is not None:
+            self.log.sac(self.tapped[i] if tapped else self.battlefield[i])
         if not tapped:
             if self.verbose:
                 print(Style.RESET_ALL + Style.DIM + "sacs " + Style.RESET_ALL + Fore.CYAN + cardLookupDict[self.battlefield[i]] + Style.RESET_ALL)
@@ -758,12 +1064,16 @@ class game():
             self.graveyard.append(self.tapped.pop(i))
 
     def tap(self, i: int) -> None:
+        if self.log is not None:
+            self.log.tap(self.battlefield[i])
         if self.verbose:
             print(Style.RESET_ALL + Style.DIM + "taps " + Style.RESET_ALL + Fore.CYAN + cardLookupDict[self.battlefield[i]] + Style.RESET_ALL)
         self.tapped.append(self.battlefield.pop(i))
 
     def delve(self, n: int) -> None:
         """Exile cards from graveyard when delving for creatures."""
+        if self.log is not None:
+            self.log.delve(n)
         if self.verbose:
             print(Style.RESET_ALL + Style.DIM + "delves " + Style.RESET_ALL + Fore.CYAN + str(n) + Style.RESET_ALL)
         for _ in range(0,n):
@@ -771,6 +1081,8 @@ class game():
 
     def playPermanent(self, i: int) -> None:
         """Plays element i from the hand and adds it to the battlefield."""
+        if self.log is not None:
+            self.log.play(self.hand[i])
         if self.verbose:
             print(Style.RESET_ALL + Style.DIM + "plays " + Style.RESET_ALL + Fore.CYAN + cardLookupDict[self.hand[i]] +
                   Style.RESET_ALL + Style.DIM + " -> field " + Style.RESET_ALL + Fore.CYAN + str(self.lookUpNames(self.battlefield)) + Style.RESET_ALL)
@@ -778,6 +1090,8 @@ class game():
         self.storm += 1
 
     def playNonPermanent(self, i: int) -> None:
+        if self.log is not None:
+            self.log.cast(self.hand[i])
         if self.verbose:
             print(Style.RESET_ALL + Style.DIM + "plays " + Style.RESET_ALL + Fore.CYAN + cardLookupDict[self.hand[i]] +
                   Style.RESET_ALL + Style.DIM + " -> yard " + Style.RESET_ALL + Fore.CYAN + str(self.lookUpNames(self.graveyard)) + Style.RESET_ALL)
@@ -832,19 +1146,8 @@ class game():
             self.floating[min(available, key=lambda i: self.floating[i])] += 1
 
     def maxCMCon(self, place: list) -> int:
-
-        cmc = 0
-        for permanent in place:
-            if permanent == gurmangler and cmc < 7:
-                cmc = 7
-            elif permanent == attendants and cmc < 8:
-                cmc = 8
-            elif permanent == star and cmc < 1:
-                cmc = 1
-            elif permanent == sphere and cmc < 1:
-                cmc = 1
-
-        return cmc
+        """Returns the highest mana value of the permanents in `place`, or 0."""
+        return max([manaValues[permanent] for permanent in place], default = 0)
 
     def statePlayFromHand(self, i: int) -> None:
         """If verbose, makes a pretty statement about a play."""
@@ -852,83 +1155,466 @@ class game():
             print(Style.RESET_ALL + Style.DIM + "plays " + Style.RESET_ALL + Fore.CYAN + cardLookupDict[self.hand[i]] + 
                   Style.RESET_ALL + Style.DIM + " -> field " + Style.RESET_ALL + Fore.CYAN + str(self.lookUpNames(self.battlefield)) + Style.RESET_ALL)
 
+class giveUpGame(game):
+    """A `game` that gives up on turns it can no longer win (see `giveUp`).
+
+    A class of its own rather than a setting, so worker processes, which
+    are handed the engine by name, play by it too."""
 
-def nearbyDecks(deckBase: list, deckOptions: list) -> list:
+    __slots__ = []
+    giveUp = True
+
+
+def nearbyDecks(deckBase: tuple, deckOptions: list) -> list:
     """Return a list of all decks created by substituting one card for
-    another given a base deck."""
-    cardCounts = {}
-    for card in cardLookupDict.keys():
-        cardCounts[card] = cardCounts.get(card, 0) + 1
+    another given a base deck.
+
+    Decks are count vectors as from `deckCounts`. Each neighbour takes out
+    one copy of a card in the deck and puts in one of `deckOptions`, keeping
+    to 4 copies of anything but basic lands, so every deck comes up once."""
+    base = list(deckBase)
+    outs = [i for i in range(0, nCards) if base[i] > 0]
+    ins = [cardIndex[card] for card in dict.fromkeys(deckOptions)
+           if card in basics or base[cardIndex[card]] < 4]
 
-    # Generate all possible combinations of cards
     all_possible_decks = [tuple(deckBase)]
-    for newCard in deckOptions:
-        for i in range(0, len(deckBase)):
-            if cardCounts[newCard] + 1 <= 4:
-                t = deepcopy(deckBase)
-                t.pop(i)
-                t.append(newCard)
-                all_possible_decks.append(tuple(t))
+    for i in outs:
+        for j in ins:
+            if i != j:
+                base[i] -= 1
+                base[j] += 1
+                all_possible_decks.append(tuple(base))
+                base[i] += 1
+                base[j] -= 1
+
+    return all_possible_decks
+
+# Get everything ready to spit out a csv
+def deckCounts(deck: list) -> tuple:
+    """Returns how many of each card, in `cardLookupDict` order, are in the deck.
+
+    This is how decks are keyed: any ordering of the same cards gives the same counts."""
+    counts = [0] * nCards
+    for card in deck:
+        counts[cardIndex[card]] += 1
+    return tuple(counts)
 
-    return list(set(all_possible_decks)) # enforce uniqueness
+def deckCards(counts: tuple) -> list:
+    """Returns the deck with the card `counts` from `deckCounts` as a list of cards."""
+    return [card for card, n in zip(cardLookupDict, counts) for _ in range(0, n)]
 
-# Get everything ready to spit out a csv
 def prettyDecklist(deck: list) -> str:
     """Returns a string of the counts of different cards ready to be put into the CSV."""
-    counts = {}
-    for card in cardLookupDict:
-        counts[card] = 0
-    for card in deck:
-        counts[card] += 1
-    
-    out = ""
-    for card in counts:
-        out += str(counts[card]) + ","
-    return out
-
-# top of CSV
-out = open('results.csv', 'w')
-out.write(", ".join([cardLookupDict[name] for name in cardLookupDict]) + ",wins,\n")
-out.close()
+    return "".join([str(n) + "," for n in deckCounts(deck)])
 
 # Do the calcs
-def testDecks(variations, n = 10, wins = {}) -> list:
-    """Tests variations of a deck and continues n times"""
+def cloneRng(rng):
+    """Returns a copy of the random stream `rng`, left where it is."""
+    if rng is random:
+        clone = random.Random()
+        clone.setstate(random.getstate())
+        return clone
+    import copy
+    return copy.deepcopy(rng)
+
+class gameSnapshot():
+    """The position of a game of `engine` with `deck`, as `game.snapshot`
+    takes it, and `rng`, a copy of its random stream or None.
+
+    `state` holds the game's zones and counters as `(slot, value)` pairs,
+    with its lists as tuples. Every fork shares them, and copies them into
+    lists of its own as it is made: playing on writes to the zones from the
+    first loop of `go`, and a copy of zones of a few dozen cards costs less
+    than watching for writes on every access would."""
+
+    __slots__ = ["engine", "deck", "rng", "state"]
+
+    # Slots a fork is given rather than sharing
+    unshared = ["rng", "profile", "log", "deck", "verbose"]
+
+    def __init__(self, engine, deck: list, rng, state: tuple):
+        self.engine = engine
+        self.deck = deck
+        self.rng = rng
+        self.state = state
+
+    def fork(self, rng = None, policy = None, profile = None, log = None) -> game:
+        """Returns a new game at the snapshot's position.
+
+        Given an `rng`, the fork's library is shuffled by it, and it plays on
+        with it. After `firstTurns` no card of the library has been seen, so
+        this deals a new game from the same opening. Without one, it plays
+        on exactly as the game snapshotted would have, which needs a snapshot
+        taken with `replay`.
+        With `policy`, a `rulePolicy` of priority rules, it plays by that
+        rather than the policy of the game snapshotted. It is profiled into
+        `profile` and logged to `log` if they are given."""
+        t = self.engine.__new__(self.engine)
+        t.deck = self.deck
+        t.verbose = False
+        t.profile = profile
+        t.log = log
+        for name, value in self.state:
+            setattr(t, name, list(value) if type(value) is tuple else value)
+        if policy is not None:
+            t.policy = policy
+        if rng is None:
+            t.rng = cloneRng(self.rng)
+        else:
+            t.rng = rng
+            t.shuffleLibrary()
+        return t
+
+def forkOutcomes(deck, games = 100, forks = 10, engine = game, seed = None, start = 0, policy = None) -> list:
+    """Plays the first turns of `games` games of `deck`, a count vector,
+    numbered and seeded as by `playOutcomes`, then plays turn 4 of each
+    `forks` times from a `snapshot`, each with the library shuffled again,
+    by `policy` if given. Returns the outcomes of each game's forks, as bytes.
+
+    Game k's forks are the rows of a `shuffleBlock` seeded from the seed and
+    k, so seeded runs are reproducible."""
+    from shuffles import shuffleSource, shuffleBlock
+    cards = deckCards(deck)
+    size = max(64, len(cards))
+    source = shuffleSource(seed, size)
+    outcomes = []
+    for k in range(start, start + games):
+        t = engine(cards, rng = source.game(k))
+        t.firstTurns()
+        position = t.snapshot(replay = False)
+        forkSeed = None if seed is None else int(numpy.random.SeedSequence([seed, k]).generate_state(1)[0])
+        block = shuffleBlock(forkSeed, 0, rows = forks, size = size)
+        won = bytearray(forks)
+        for j in range(0, forks):
+            won[j] = position.fork(block.game(j), policy).go()
+        outcomes.append(bytes(won))
+    return outcomes
+
+def playOutcomes(deck, games = 1000, engine = game, seed = None, start = 0, profile = None, logger = None) -> bytes:
+    """Plays `games` goldfish games with `deck`, a count vector as from `deckCounts`,
+    and returns one byte per game, 1 if it was won.
+
+    `engine` is the game class to play them with, e.g. `game` or `countGame`.
+    Batch engines such as `batchGame` play all of the games at once.
+
+    With a `seed`, the games are numbered from `start` and game k is shuffled
+    by `shuffleSource(seed).game(k)`, so game k of every deck sees the same
+    shuffles and decks can be compared game by game. The shuffles are made a
+    block of games at a time by the `shuffleSource`.
+
+    The games' rules are added up in `profile`, a `ruleProfile`, if one is given,
+    and the games `logger`, a `gameLogger`, wants are logged to it by number.
+    Batch engines are not logged."""
+    if getattr(engine, "batch", False):
+        t = engine(deckCards(deck), games, None if seed is None else [seed, start], profile)
+        t.firstTurns()
+        return t.go().astype(numpy.uint8).tobytes()
+
+    from shuffles import shuffleSource
+    cards = deckCards(deck)
+    source = shuffleSource(seed, max(64, len(cards)))
+    won = bytearray(games)
+    t = None
+    for k in range(0, games):
+        log = None
+        if logger is not None and logger.wants(start + k):
+            from gamelog import gameLog
+            log = gameLog()
+        rng = source.game(start + k)
+        if t is None:
+            t = engine(cards, rng = rng, profile = profile, log = log)
+        else:
+            t.reset(rng, log)
+        t.firstTurns()
+        won[k] = t.go()
+        if log is not None:
+            logger.add(deck, seed, start + k, won[k], log)
+    return bytes(won)
+
+def playGames(deck, games = 1000, engine = game, seed = None, start = 0) -> int:
+    """Plays `games` goldfish games with `deck` and returns how many were won."""
+    return sum(playOutcomes(deck, games, engine, seed, start))
+
+def playChunk(unit: tuple) -> tuple:
+    """Worker entry point: plays one `(deck, games, engine, seed, start, profiled, logEvery)` unit
+    and returns `(deck, start, outcomes, profile, logs)`, with a `ruleProfile` if `profiled`
+    and the records of every `logEvery`th game for `gameLogger.write`."""
+    deck, games, engine, seed, start, profiled, logEvery = unit
+    profile = None
+    if profiled:
+        from profiling import ruleProfile
+        profile = ruleProfile()
+    logger = None
+    if logEvery is not None:
+        from gamelog import gameLogger
+        logger = gameLogger(logEvery)
+    won = playOutcomes(deck, games, engine, seed, start, profile, logger)
+    return deck, start, won, profile, [] if logger is None else logger.records
+
+def splitGames(decks: list, games: int, workers: int, engine = game, seed = None, start = 0, profiled = False, logEvery = None) -> list:
+    """Splits the games for each deck into `(deck, games, engine, seed, start, profiled, logEvery)` work units.
+
+    Decks are only split into chunks when there are too few of them to keep
+    every worker busy."""
+    chunks = max(1, min(games, -(-4 * workers // max(1, len(decks)))))
+    units = []
+    for deck in decks:
+        first = start
+        for c in range(0, chunks):
+            n = games // chunks + (1 if c < games % chunks else 0)
+            if n > 0:
+                units.append((deck, n, engine, seed, first, profiled, logEvery))
+                first += n
+    return units
+
+def playDecks(decks: list, games: int, engine = game, pool = None, workers = 1, seed = None, start = 0, done = None, profiles = None, logger = None, checkpoint = None) -> dict:
+    """Plays `games` games with each deck and returns each deck's outcomes
+    as from `playOutcomes`.
+
+    The games are spread over `pool`, a `multiprocessing.Pool` of `workers`
+    processes, if one is given. `done(deck, outcomes)` is called as soon as
+    each deck has played all of its games. If `profiles` is a dict, each
+    deck's games are profiled into its `ruleProfile` there, and the games
+    `logger`, a `gameLogger`, wants are logged to it. Work units already
+    played into `checkpoint` are taken from it, and new ones added to it."""
+    if profiles is not None:
+        from profiling import ruleProfile
+        for deck in decks:
+            profiles.setdefault(deck, ruleProfile())
+
+    if pool is not None:
+        outcomes = {deck: bytearray(games) for deck in decks}
+        left = {deck: games for deck in decks}
+        units = splitGames(decks, games, workers, engine, seed, start, profiles is not None, None if logger is None else logger.every)
+        played, toPlay = [], units
+        if checkpoint is not None:
+            played = [(deck, first, checkpoint.lookup(deck, first, n), None, []) for deck, n, _, _, first, _, _ in units]
+            toPlay = [unit for unit, known in zip(units, played) if known[2] is None]
+            played = [known for known in played if known[2] is not None]
+        chunks = itertools.chain(played, pool.imap_unordered(playChunk, toPlay))
+        for deck, first, won, profile, logs in tqdm(chunks, total = len(units), leave = False):
+            outcomes[deck][first - start:first - start + len(won)] = won
+            if profile is not None:
+                profiles[deck].merge(profile)
+            for record in logs:
+                logger.write(record)
+            if checkpoint is not None:
+                checkpoint.add(deck, first, won)
+            left[deck] -= len(won)
+            if left[deck] == 0 and done is not None:
+                done(deck, bytes(outcomes[deck]))
+        return {deck: bytes(won) for deck, won in outcomes.items()}
+
+    outcomes = {}
+    for deck in tqdm(decks, leave = False):
+        outcomes[deck] = None if checkpoint is None else checkpoint.lookup(deck, start, games)
+        if outcomes[deck] is None:
+            outcomes[deck] = playOutcomes(deck, games, engine, seed, start, None if profiles is None else profiles[deck], logger)
+            if checkpoint is not None:
+                checkpoint.add(deck, start, outcomes[deck])
+        if done is not None:
+            done(deck, outcomes[deck])
+    return outcomes
+
+def winRate(result: tuple) -> float:
+    """Returns the win rate of a `(won, played)` result."""
+    return result[0] / max(1, result[1])
+
+def bestDeck(wins) -> tuple:
+    """Returns the deck with the best win rate in `wins`, a dict or a `store.resultStore`."""
+    if isinstance(wins, dict):
+        return max(wins, key = lambda x : winRate(wins[x]))
+    return wins.best()
+
+def scoreDecks(decks: list, wins: dict, games = 1000, engine = game, pool = None, workers = 1, race = False, seed = None, cache = None, results = None, bandit = None, profiles = None, logger = None, checkpoint = None) -> int:
+    """Scores each of `decks` that is not yet in `wins` into it, and returns
+    how many games were played.
+
+    Decks are count vectors as from `deckCounts`, and `wins`, a dict or a
+    `store.resultStore`, maps each deck tried to its `(won, played)` games. The games are spread over `pool`, a
+    `multiprocessing.Pool` of `workers` processes, if one is given. `engine`
+    is the game class to use.
+    With `race`, decks play in rounds and stop once they are clearly beaten
+    by any of `decks`, including ones scored before.
+    With `bandit`, a confidence such as 0.95, games instead go by Thompson
+    sampling to the decks that could be the best of `decks`, until one of
+    them is the best with that confidence.
+    With a `seed`, every deck plays the same numbered games (see `playOutcomes`)
+    and races compare decks game by game. Decks already in `cache`, a
+    `simCache`, are looked up rather than played, and new results are added.
+    Each deck's result is written to `results`, a `resultsWriter`, once it is in.
+    If `profiles` is a dict, the rules played by each deck's games are
+    profiled into it (see `playDecks`) and written with its result.
+    A sample of the games played is logged to `logger`, a `gameLogger`, if given.
+    Each deck's result, and the games played towards it, are kept in
+    `checkpoint`, a `checkpoint.checkpoint`, if given."""
+
+    toCheck = [deck for deck in dict.fromkeys(decks) if deck not in wins]
+
+    def record(deck):
+        if checkpoint is not None:
+            checkpoint.scored(deck, wins[deck])
+        if results is not None:
+            results.write(deck, wins[deck], None if profiles is None else profiles.get(deck))
+
+    if cache is not None:
+        cached = cache.lookup(toCheck, engine, games, seed)
+        wins.update(cached)
+        for deck in cached:
+            record(deck)
+        toCheck = [deck for deck in toCheck if deck not in wins]
+
+    play = lambda decks, n, start = 0, done = None: playDecks(decks, n, engine, pool, workers, seed, start, done, profiles, logger, checkpoint)
+    if race:
+        from racing import raceDecks
+        played = raceDecks(toCheck, list(decks), wins, play, games, paired = seed is not None, done = record)
+    elif bandit is not None:
+        from bandit import banditDecks
+        played = banditDecks(toCheck, list(decks), wins, play, games, confidence = bandit, seed = seed, done = record)
+    else:
+        def score(deck, won):
+            wins[deck] = (sum(won), len(won))
+            record(deck)
+        play(toCheck, games, done = score)
+        played = games * len(toCheck)
+    if cache is not None:
+        cache.store({deck: wins[deck] for deck in toCheck}, engine, games, seed)
+    return played
+
+def testDecks(variations, n = 10, wins = None, workers = 1, engine = game, race = False, seed = None, cache = None, results = None, bandit = None, profiles = None, logger = None, pool = None, checkpoint = None) -> list:
+    """Tests variations of a deck and continues n times.
+
+    Each iteration scores the variations with `scoreDecks`, which describes
+    the other arguments, and moves on to the neighbours of the best deck so
+    far. The games are spread over `pool` if one is given, such as a
+    `distributed.coordinator`, and otherwise with `workers` > 1 over a
+    process pool made for each iteration. Progress is kept in `checkpoint`,
+    if given, as each iteration starts and as results come in."""
+
+    if wins is None:
+        from store import resultStore
+        wins = resultStore()
+
+    if checkpoint is not None:
+        checkpoint.begin([tuple(deck) for deck in variations], n)
 
     if n > 0:
 
-        def checkOneDeck(deck):
-            if tuple(deck) not in wins.keys():
-                won = 0
-                for _ in range(0,1000):
-                    t = game(list(deck))
-                    t.firstTurns()
-                    won += t.go()
-                wins[tuple(deck)] = won
-
-        #thrds = []
-        for deck in tqdm(variations):
-        #    tempThread = threading.Thread(target=checkOneDeck, args=(list(deck),))
-        #    tempThread.start()
-        #    thrds.append(tempThread)
-            checkOneDeck(list(deck))
-        
-        #for th in tqdm(thrds):
-        #    th.join()
-
-        # The fact that the orders are the same so this works is slightly tenuous.
-        out = open('results.csv', 'a')
-        for deck in wins:
-            out.write(prettyDecklist(list(deck)) + str(wins[deck]) + ",\n")
-        out.close()
+        variations = [tuple(deck) for deck in variations]
+        fresh = len([deck for deck in variations if deck not in wins])
+        iterationPool = pool
+        if pool is None and workers > 1:
+            iterationPool = multiprocessing.Pool(workers)
+        played = scoreDecks(variations, wins, 1000, engine, iterationPool, workers, race, seed, cache, results, bandit, profiles, logger, checkpoint)
+        if race:
+            print(f"raced {fresh} decks in {played} games ({1000 * fresh} without racing)")
+        elif bandit is not None:
+            spent = sorted(wins[deck][1] for deck in variations)
+            print(f"bandit scored {fresh} decks in {played} games ({1000 * fresh} uniform), "
+                  f"{spent[0]} to {spent[-1]} games a deck, median {spent[len(spent) // 2]}")
+        if iterationPool is not pool:
+            iterationPool.close()
 
         # find best deck and do anohter iterartion using that
-        newVars = nearbyDecks(list(max(wins, key = lambda x : x[1])), deckOptions)
-        return testDecks(newVars, n-1, wins) 
+        newVars = nearbyDecks(bestDeck(wins), deckOptions)
+        return testDecks(newVars, n-1, wins, workers, engine, race, seed, cache, results, bandit, profiles, logger, pool, checkpoint) 
     
     else: 
-        return max(wins, key = lambda x : x[1])
-
-# Decks are by default tuples, but are passed to games as lists
-toCheck = nearbyDecks(default, deckOptions)
-print(testDecks(toCheck))
+        return bestDeck(wins)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Optimise a fishelbrand deck by goldfishing it.")
+    parser.add_argument("-n", "--iterations", type = int, default = 10, help = "hill climbing iterations")
+    parser.add_argument("-S", "--strategy", choices = ["climb", "steepest", "first", "beam", "anneal", "genetic"], default = "climb",
+                        help = "how to search for decks: climb for --iterations, or a search.py strategy within --budget")
+    parser.add_argument("-g", "--budget", type = int, default = 2000000, help = "total games a search.py strategy may play")
+    parser.add_argument("-w", "--workers", type = int, default = 1, help = "worker processes (0 = one per core)")
+    parser.add_argument("-e", "--engine", choices = ["list", "count", "batch"], default = "list", help = "game engine to simulate with")
+    parser.add_argument("--give-up", action = "store_true", help = "end turns once they can no longer win; the same outcomes, faster only on decks that are often doomed")
+    parser.add_argument("-r", "--race", action = "store_true", help = "stop playing decks once they are clearly beaten")
+    parser.add_argument("-B", "--bandit", type = float, nargs = "?", const = 0.95, metavar = "CONFIDENCE",
+                        help = "give games to the decks that could be best until one is, with this confidence (default 0.95)")
+    parser.add_argument("-s", "--seed", type = int, help = "deal game k of every deck from the same seeded shuffles")
+    parser.add_argument("-c", "--cache", default = "simcache.sqlite", help = "file to keep deck results in between runs")
+    parser.add_argument("--no-cache", action = "store_true", help = "simulate every deck, even ones scored before")
+    parser.add_argument("-o", "--out", default = "results.csv", help = "CSV file to write each deck's result to")
+    parser.add_argument("-p", "--profile", help = "CSV file to write how often each deck's games play each rule to")
+    parser.add_argument("--solved", help = "CSV file to write how many of a sample of each deck's games the solver could have won to; slow")
+    parser.add_argument("--solve-games", type = int, default = 100, help = "games of each deck to solve for --solved")
+    parser.add_argument("-b", "--binary", help = "binary file to append each deck's result to, for loading with results.loadResults")
+    parser.add_argument("-l", "--log", help = "binary file to log a sample of the games played to, for replaying with gamelog.py")
+    parser.add_argument("--log-every", type = int, default = 1000, help = "log game k of each deck when k is a multiple of this")
+    parser.add_argument("--listen", metavar = "HOST:PORT", help = "hand the games to distributed.py workers connecting here, splitting them for --workers of them")
+    parser.add_argument("--key", help = "key distributed.py workers must connect with (default: a random key, printed)")
+    parser.add_argument("--timeout", type = float, default = 600.0, help = "seconds a distributed.py worker may take over a unit before it goes to another")
+    parser.add_argument("--resident", type = int, default = 10000, help = "deck results to hold in memory, with the rest kept on disk")
+    parser.add_argument("--checkpoint", help = "file to keep the climb's progress in, to carry on from with --resume")
+    parser.add_argument("--resume", action = "store_true", help = "carry on the climb saved in --checkpoint, appending to the results and log files")
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs the --checkpoint file to carry on from")
+    if args.resume and args.strategy != "climb":
+        parser.error("only a climb keeps a checkpoint, so --resume needs -S climb")
+
+    engine = giveUpGame if args.give_up else game
+    if args.engine == "count":
+        from countgame import countGame, giveUpCountGame
+        engine = giveUpCountGame if args.give_up else countGame
+    elif args.engine == "batch":
+        if args.give_up:
+            parser.error("the batch engine plays every game's loop in step and has no --give-up")
+        from batchgame import batchGame
+        engine = batchGame
+
+    cache = None
+    if not args.no_cache:
+        from cache import simCache
+        cache = simCache(args.cache)
+        cache.prune(engine)
+
+    from results import resultsWriter
+    results = resultsWriter(args.out, args.binary, args.profile, append = args.resume, solvedPath = args.solved, solveGames = args.solve_games, seed = args.seed)
+    profiles = {} if args.profile else None
+    logger = None
+    if args.log:
+        from gamelog import gameLogger
+        logger = gameLogger(args.log_every, args.log, append = args.resume)
+
+    # Decks are searched as count vectors, but are passed to games as lists
+    workers = args.workers or multiprocessing.cpu_count()
+    pool = None
+    if args.listen:
+        from distributed import coordinator, parseAddress
+        pool = coordinator(parseAddress(args.listen), None if args.key is None else args.key.encode(), args.timeout)
+        if args.key is None:
+            print(f"workers connect with: python distributed.py worker {args.listen} --key {pool.key.decode()}")
+    if args.strategy == "climb":
+        toCheck = nearbyDecks(deckCounts(default), deckOptions)
+        from store import resultStore
+        iterations, wins, saved = args.iterations, resultStore(args.resident), None
+        if args.checkpoint:
+            from checkpoint import checkpoint, loadCheckpoint
+            if args.resume:
+                try:
+                    saved = loadCheckpoint(args.checkpoint)
+                except FileNotFoundError:
+                    parser.error(f"there is no checkpoint at {args.checkpoint} to resume")
+                toCheck, iterations = saved.variations, saved.left
+                for deck, result in saved.scoredDecks():
+                    wins[deck] = result
+                print(f"resuming with {iterations} iterations left and {len(wins)} decks scored")
+            else:
+                saved = checkpoint(args.checkpoint)
+        print(deckCards(testDecks(toCheck, iterations, wins, workers, engine, args.race, args.seed, cache, results, args.bandit, profiles, logger, pool, saved)))
+    else:
+        from search import evaluator, strategies
+        ev = evaluator(args.budget, 1000, engine, workers, args.race, args.seed, cache, results, args.bandit, profiles, logger, pool, args.resident)
+        best = strategies[args.strategy](ev, deckCounts(default), deckOptions, random.Random(args.seed))
+        ev.close()
+        print(f"scored {len(ev.wins)} decks in {ev.spent} games")
+        print(deckCards(best))
+    if pool is not None:
+        pool.close()
+    results.close()
+    if logger is not None:
+        logger.close()
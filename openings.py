@@ -0,0 +1,108 @@
+"""
+Opening hands
+-------------
+
+`game.mulligan` keeps a hand by how many lands and easy draws (cantrips and
+the like) are in it, mulliganing down to 4 cards. How many of each turn up
+in a hand follows a multivariate hypergeometric distribution over the
+deck's lands, easy draws and other cards, so the chance of keeping each
+possible hand can be worked out exactly rather than by simulation.
+
+The odds depend only on those three counts, so they are worked out once for
+each mix of counts and shared by every deck with the same mix. Games deal
+their opening hand straight from them with `dealOpening`.
+
+    python openings.py
+"""
+
+import bisect, functools
+from fractions import Fraction
+from math import comb
+
+from main import default, cardFlags, kindVector, LAND, EASYDRAW
+
+# What `game.mulligan` counts a hand's lands and easy draws by, over dense card indices
+landVector = kindVector(LAND)
+easydrawVector = kindVector(EASYDRAW)
+
+def keeps(nLands: int, nDraw: int, n: int) -> bool:
+    """Returns whether a hand of `n` cards with `nLands` lands and `nDraw` easy draws is kept."""
+    return (nLands >= 2 and nLands < 5 and nDraw >= 1) or (n <= 5 and nLands >= 2) or n <= 4
+
+def handOdds(nLands: int, nDraw: int, size: int, n: int) -> dict:
+    """Returns the chance of each `(lands, draws)` in a hand of `n` cards from
+    a deck of `size` cards with `nLands` lands and `nDraw` easy draws."""
+    hands = comb(size, n)
+    return {(l, d): Fraction(comb(nLands, l) * comb(nDraw, d) * comb(size - nLands - nDraw, n - l - d), hands)
+            for l in range(0, n + 1) for d in range(0, n + 1 - l)
+            if comb(nLands, l) * comb(nDraw, d) * comb(size - nLands - nDraw, n - l - d) > 0}
+
+@functools.lru_cache(maxsize = None)
+def openingOdds(nLands: int, nDraw: int, size: int) -> dict:
+    """Returns the chance of each `(n, lands, draws)` hand being the one kept,
+    mulliganing from 7 cards down to 4, for a deck of `size` cards with
+    `nLands` lands and `nDraw` easy draws."""
+    odds = {}
+    reach = Fraction(1)
+    for n in [7, 6, 5, 4]:
+        for (l, d), p in handOdds(nLands, nDraw, size, n).items():
+            if keeps(l, d, n):
+                odds[(n, l, d)] = reach * p
+        reach -= sum(p for (m, _, _), p in odds.items() if m == n)
+    return odds
+
+def mulliganOdds(nLands: int, nDraw: int, size: int) -> dict:
+    """Returns the chance of keeping each hand size from 7 down to 4."""
+    sizes = {n: Fraction(0) for n in [7, 6, 5, 4]}
+    for (n, _, _), p in openingOdds(nLands, nDraw, size).items():
+        sizes[n] += p
+    return sizes
+
+def deckMix(counts: tuple) -> tuple:
+    """Returns the `(lands, easy draws, cards)` of a deck count vector as from `deckCounts`."""
+    return int(landVector @ counts), int(easydrawVector @ counts), sum(counts)
+
+@functools.lru_cache(maxsize = None)
+def openingTable(nLands: int, nDraw: int, size: int) -> tuple:
+    """Returns the kept hands of `openingOdds` and their running total chance, for sampling."""
+    hands = list(openingOdds(nLands, nDraw, size).items())
+    total = 0.0
+    running = []
+    for _, p in hands:
+        total += float(p)
+        running.append(total)
+    return [hand for hand, _ in hands], running
+
+def dealOpening(library: list, rng) -> list:
+    """Deals the opening hand kept after mulliganing out of `library`, a list of
+    cards, shuffles the rest of the library and returns the hand.
+
+    Its size, lands and easy draws come from `openingTable`, then the cards of
+    each kind are picked at random, which deals hands with the same odds as
+    drawing and mulliganing would."""
+    landPile, drawPile, otherPile = [], [], []
+    for card in library:
+        flags = cardFlags[card]
+        if flags & LAND:
+            landPile.append(card)
+        elif flags & EASYDRAW:
+            drawPile.append(card)
+        else:
+            otherPile.append(card)
+
+    hands, running = openingTable(len(landPile), len(drawPile), len(library))
+    n, l, d = hands[min(bisect.bisect(running, rng.random() * running[-1]), len(hands) - 1)]
+    hand = rng.sample(landPile, l) + rng.sample(drawPile, d) + rng.sample(otherPile, n - l - d)
+    rng.shuffle(hand)
+
+    for card in hand:
+        library.remove(card)
+    rng.shuffle(library)
+    return hand
+
+if __name__ == "__main__":
+    from main import deckCounts
+    mix = deckMix(deckCounts(default))
+    print(f"default deck: {mix[0]} lands, {mix[1]} easy draws, {mix[2]} cards")
+    for n, p in mulliganOdds(*mix).items():
+        print(f"keep {n}: {float(p):.4f}")
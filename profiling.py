@@ -0,0 +1,89 @@
+"""
+Rule profiling
+--------------
+
+Counts which of `game.go`'s priority rules fire, how long each takes, how
+many times round its loop each game goes and how each game ends: won,
+decked (ran out of library), stuck (nothing left it would play) or doomed
+(given up on once it could no longer win, see `game.manaBound`). Games
+only profile when given a `ruleProfile`, and cost next to nothing otherwise.
+
+Profiles add up over any number of games, so one can cover a deck's whole
+evaluation, and are written out beside the results with `resultsWriter`.
+
+    python profiling.py [GAMES]
+"""
+
+import sys, time
+
+from main import obviousRules, priorityRules
+
+# The rules of `game.go`, in priority order, between running out of cards
+# and finding nothing to play, then giving up
+ruleNames = ["decked"] + list(dict.fromkeys(rule for rule, _, _, _ in obviousRules + priorityRules)) + ["stuck", "doomed"]
+
+endings = ["won", "decked", "stuck", "doomed"]
+
+class ruleProfile():
+    """Start an empty profile of the rules played in goldfishing games."""
+
+    def __init__(self):
+        self.fires = dict.fromkeys(ruleNames, 0)
+        self.seconds = dict.fromkeys(ruleNames, 0.0)
+        self.endings = dict.fromkeys(endings, 0)
+        self.loops = {} # loops taken -> games
+
+    def record(self, rule: str, start: float, ending = None, loops = 0, games = 1) -> None:
+        """Counts `games` games playing `rule` in a loop that began at `start`
+        on the `time.perf_counter` clock. With an `ending`, those games ended
+        there after `loops` loops."""
+        self.fires[rule] += games
+        self.seconds[rule] += time.perf_counter() - start
+        if ending is not None:
+            self.endings[ending] += games
+            self.loops[loops] = self.loops.get(loops, 0) + games
+
+    def merge(self, other) -> None:
+        """Adds the games profiled in `other` to this profile."""
+        for rule in ruleNames:
+            self.fires[rule] += other.fires[rule]
+            self.seconds[rule] += other.seconds[rule]
+        for ending in endings:
+            self.endings[ending] += other.endings[ending]
+        for loops, games in other.loops.items():
+            self.loops[loops] = self.loops.get(loops, 0) + games
+
+    def games(self) -> int:
+        return sum(self.endings.values())
+
+    def meanLoops(self) -> float:
+        return sum(loops * games for loops, games in self.loops.items()) / max(1, self.games())
+
+    def report(self) -> str:
+        """Returns a table of the rules fired, slowest first, and how the games ended."""
+        total = max(sum(self.seconds.values()), 1e-12)
+        lines = [f"{'rule':<14}{'fires':>10}{'per game':>10}{'ms':>10}{'time':>8}"]
+        for rule in sorted(ruleNames, key = lambda rule: -self.seconds[rule]):
+            if self.fires[rule] > 0:
+                lines.append(f"{rule:<14}{self.fires[rule]:>10}{self.fires[rule] / max(1, self.games()):>10.2f}"
+                             f"{1000 * self.seconds[rule]:>10.1f}{self.seconds[rule] / total:>8.1%}")
+        lines.append(", ".join(f"{ending} {n}" for ending, n in self.endings.items()) +
+                     f" of {self.games()} games, {self.meanLoops():.1f} loops a game")
+        return "\n".join(lines)
+
+def profileHeader() -> str:
+    """Returns the CSV header of the columns from `profileColumns`."""
+    return ",".join([f"{rule} fires" for rule in ruleNames] + [f"{rule} seconds" for rule in ruleNames] +
+                    endings + ["mean loops"])
+
+def profileColumns(profile: ruleProfile) -> str:
+    """Returns `profile` as comma separated values, in the order of `profileHeader`."""
+    return ",".join([str(profile.fires[rule]) for rule in ruleNames] +
+                    [f"{profile.seconds[rule]:.6f}" for rule in ruleNames] +
+                    [str(profile.endings[ending]) for ending in endings] + [f"{profile.meanLoops():.3f}"])
+
+if __name__ == "__main__":
+    from main import default, deckCounts, playOutcomes
+    profile = ruleProfile()
+    playOutcomes(deckCounts(default), int(sys.argv[1]) if len(sys.argv) > 1 else 1000, profile = profile)
+    print(profile.report())
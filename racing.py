@@ -0,0 +1,85 @@
+"""
+Deck racing
+-----------
+
+Instead of playing a fixed number of games with every deck, play them in
+rounds and stop playing a deck as soon as it is confidently worse than the
+best deck in the race. The games saved on hopeless decks are what would
+otherwise dominate a hill climbing iteration, as most neighbours of a good
+deck are worse.
+"""
+
+import math
+
+def wilson(won: int, played: int, z: float) -> tuple:
+    """Returns the `(lower, upper)` Wilson score bounds on a win rate.
+
+    Unlike a normal approximation these stay sensible for the low win rates
+    and small samples early in a race."""
+    if played == 0:
+        return 0.0, 1.0
+    p = won / played
+    centre = p + z * z / (2 * played)
+    spread = z * math.sqrt(p * (1 - p) / played + z * z / (4 * played * played))
+    scale = 1 + z * z / played
+    return (centre - spread) / scale, (centre + spread) / scale
+
+def pairedGap(leader: bytes, other: bytes, z: float) -> float:
+    """Returns a lower bound on how much better `leader` did than `other`
+    over the same games, from their game-by-game outcomes.
+
+    Games both decks won or both lost cancel out, which is what makes a
+    paired comparison so much tighter than comparing two win rates."""
+    n = len(leader)
+    diffs = [a - b for a, b in zip(leader, other)]
+    mean = sum(diffs) / n
+    variance = sum((d - mean) ** 2 for d in diffs) / max(1, n - 1)
+    return mean - z * math.sqrt(variance / n)
+
+def raceDecks(decks: list, contenders: list, wins: dict, play, games = 1000, roundGames = 100, z = 3.0, paired = False, done = None) -> int:
+    """Scores `decks` into `wins` by racing them, and returns how many games were played.
+
+    Every deck still in the race plays `roundGames` more games each round
+    through `play(decks, games, start)`, which returns each deck's outcomes
+    for the games numbered from `start`. After a round, any deck whose upper
+    bound is below the best lower bound among `contenders` drops out.
+    `contenders` may include decks already scored in `wins`, which then set
+    the bar without playing. Decks that are never beaten play `games`
+    games, the same as without racing.
+    `z` sets the width of the bounds, so a larger `z` drops fewer decks by
+    mistake at the cost of playing more games.
+
+    With `paired`, `play` must deal game k the same way for every deck (a
+    seeded run). Decks are then also dropped when they are confidently
+    behind the leader of the race over the games both have played.
+
+    `done(deck)` is called as each deck leaves the race, with its final score in `wins`."""
+
+    outcomes = {}
+    for deck in decks:
+        wins[deck] = (0, 0)
+        outcomes[deck] = b""
+
+    racing = list(decks)
+    played = 0
+    while len(racing) > 0:
+        start = wins[racing[0]][1]
+        n = min(roundGames, games - start)
+        for deck, won in play(racing, n, start).items():
+            wins[deck] = (wins[deck][0] + sum(won), wins[deck][1] + n)
+            outcomes[deck] += won
+        played += n * len(racing)
+
+        bar = max(wilson(*wins[deck], z)[0] for deck in contenders if deck in wins)
+        beaten = [deck for deck in racing if wilson(*wins[deck], z)[1] < bar]
+        if paired:
+            leader = max(racing, key = lambda deck: wins[deck][0])
+            beaten += [deck for deck in racing if pairedGap(outcomes[leader], outcomes[deck], z) > 0]
+        left = [deck for deck in racing if wins[deck][1] < games and deck not in beaten]
+        if done is not None:
+            for deck in racing:
+                if deck not in left:
+                    done(deck)
+        racing = left
+
+    return played
@@ -0,0 +1,155 @@
+"""
+Results files
+-------------
+
+Every deck scored is written out once, as soon as its result is in, rather
+than the whole table of results being rewritten each iteration. Results go
+to a CSV file, a compact binary file, or both. Decks whose games were
+profiled can also have their rule profiles written to a CSV of their own,
+and a sample of each deck's games can be searched by the solver (see
+solver.py) for how many could have been won.
+
+The binary file is a short header naming the cards, followed by one
+fixed-size record per deck: how many of each card it runs, as bytes, then
+its wins and games. It is only ever appended to, so it can collect the
+results of many runs, and `loadResults` maps it into NumPy arrays without
+reading it in. `exportCsv` turns it back into a CSV.
+
+    python results.py results.bin results.csv
+"""
+
+import struct, sys
+import numpy
+
+from main import cardLookupDict
+from profiling import profileHeader, profileColumns
+
+MAGIC = b"FISHRES1"
+
+def recordType(nCards: int) -> numpy.dtype:
+    """Returns the NumPy type of one binary record for a pool of `nCards` cards."""
+    return numpy.dtype([("counts", numpy.uint8, (nCards,)), ("won", "<u4"), ("played", "<u4")])
+
+def csvHeader(cards) -> str:
+    """Returns the header row of a results CSV for the card ids `cards`."""
+    return ", ".join([cardLookupDict[card] for card in cards]) + ",wins,games,\n"
+
+def csvRow(counts, won: int, played: int) -> str:
+    """Returns the CSV row for a deck's card counts and result."""
+    return ",".join([str(n) for n in counts] + [str(won), str(played)]) + ",\n"
+
+def binaryHeader(cards) -> bytes:
+    """Returns the header of a binary results file for the card ids `cards`."""
+    return MAGIC + struct.pack(f"<I{len(cards)}H", len(cards), *cards)
+
+def readHeader(f) -> list:
+    """Reads the header of the binary results file `f` and returns its card ids."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{f.name} is not a binary results file")
+    nCards, = struct.unpack("<I", f.read(4))
+    return list(struct.unpack(f"<{nCards}H", f.read(2 * nCards)))
+
+class resultsWriter():
+    """Stream deck results to the CSV file at `csvPath` and, if given, the
+    binary file at `binaryPath` and the rule profiles CSV at `profilePath`.
+    Any path may be None to skip that file.
+
+    With `solvedPath`, the first `solveGames` games of each deck, numbered
+    and seeded by `seed` as `playOutcomes` does, are played by `go` and
+    searched by `solver.solveOutcomes`, and the counts won and winnable are
+    written to the CSV at `solvedPath`.
+
+    The CSV files are started afresh unless `append`, while the binary file
+    is appended to, as long as it was written for the same cards."""
+
+    def __init__(self, csvPath = "results.csv", binaryPath = None, profilePath = None, append = False, solvedPath = None, solveGames = 100, seed = None):
+        self.cards = list(cardLookupDict)
+        self.csv = None
+        self.binary = None
+        self.profiles = None
+        self.solved = None
+        self.solveGames = solveGames
+        self.seed = seed
+        self.record = recordType(len(self.cards))
+
+        if csvPath is not None:
+            self.csv = open(csvPath, "a" if append else "w", buffering = 1)
+            if self.csv.tell() == 0:
+                self.csv.write(csvHeader(self.cards))
+
+        if profilePath is not None:
+            self.profiles = open(profilePath, "a" if append else "w", buffering = 1)
+            if self.profiles.tell() == 0:
+                self.profiles.write(csvHeader(self.cards)[:-1] + profileHeader() + "\n")
+
+        if solvedPath is not None:
+            self.solved = open(solvedPath, "a" if append else "w", buffering = 1)
+            if self.solved.tell() == 0:
+                self.solved.write(csvHeader(self.cards)[:-1] + "sampled,heuristic wins,could have won,unsolved\n")
+
+        if binaryPath is not None:
+            self.binary = open(binaryPath, "ab+")
+            self.binary.seek(0)
+            if self.binary.read(1) == b"":
+                self.binary.write(binaryHeader(self.cards))
+            else:
+                self.binary.seek(0)
+                if readHeader(self.binary) != self.cards:
+                    raise ValueError(f"{binaryPath} holds results for a different card pool")
+            self.binary.flush()
+
+    def write(self, deck, result: tuple, profile = None) -> None:
+        """Writes the `(won, played)` result of `deck`, a count vector as from
+        `deckCounts`, and its `ruleProfile` if it has one."""
+        if self.csv is not None:
+            self.csv.write(csvRow(deck, *result))
+        if self.profiles is not None and profile is not None:
+            self.profiles.write(csvRow(deck, *result)[:-1] + profileColumns(profile) + "\n")
+        if self.solved is not None:
+            from solver import solveOutcomes
+            heuristic, solved, unsolved = solveOutcomes(deck, self.solveGames, self.seed)
+            self.solved.write(csvRow(deck, *result)[:-1] + f"{self.solveGames},{heuristic},{solved},{unsolved}\n")
+        if self.binary is not None:
+            row = numpy.zeros(1, self.record)
+            row["counts"], row["won"], row["played"] = deck, result[0], result[1]
+            self.binary.write(row.tobytes())
+            self.binary.flush()
+
+    def close(self) -> None:
+        if self.csv is not None:
+            self.csv.close()
+        if self.binary is not None:
+            self.binary.close()
+        if self.profiles is not None:
+            self.profiles.close()
+        if self.solved is not None:
+            self.solved.close()
+
+def loadResults(path: str) -> tuple:
+    """Maps the binary results file at `path` into memory and returns
+    `(cards, records)`: the card ids, and an array with a row per deck whose
+    `counts`, `won` and `played` fields index like any NumPy array."""
+    with open(path, "rb") as f:
+        cards = readHeader(f)
+        offset = f.tell()
+        f.seek(0, 2)
+        size = f.tell()
+    record = recordType(len(cards))
+    rows = (size - offset) // record.itemsize
+    if rows == 0:
+        return cards, numpy.zeros(0, record)
+    return cards, numpy.memmap(path, record, "r", offset, (rows,))
+
+def exportCsv(binaryPath: str, csvPath: str) -> int:
+    """Writes the binary results file at `binaryPath` out as a CSV and returns how many decks it held."""
+    cards, records = loadResults(binaryPath)
+    with open(csvPath, "w") as out:
+        out.write(csvHeader(cards))
+        for row in records:
+            out.write(csvRow(row["counts"], row["won"], row["played"]))
+    return len(records)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python results.py RESULTS.bin OUT.csv")
+    print(exportCsv(sys.argv[1], sys.argv[2]), "decks exported")
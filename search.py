@@ -0,0 +1,177 @@
+"""
+Deck search
+-----------
+
+Strategies for looking for the best deck within a total budget of games.
+Every strategy scores decks through the same `evaluator`, which plays them
+with `scoreDecks` and stops scoring once the budget is spent, so strategies
+can be swapped without changing how decks are played, raced or cached.
+
+Each strategy is called as `strategy(ev, start, options, rng)` with a
+starting deck as a count vector (see `deckCounts`), the cards it may put
+into decks and a random stream, and returns the best deck it scored.
+"""
+
+import math, multiprocessing, random
+
+from main import game, deckOptions, nearbyDecks, scoreDecks, winRate, nCards
+from store import resultStore
+
+class evaluator():
+    """Scores decks with `games` games each, and no more than `budget` games in all.
+
+    The remaining arguments are passed on to `scoreDecks`. Games are spread
+    over `pool` if one is given, and otherwise with `workers` > 1 one process
+    pool is kept for the whole search. Results are kept in a `resultStore`
+    holding `resident` of them in memory."""
+
+    def __init__(self, budget: int, games = 1000, engine = game, workers = 1, race = False, seed = None, cache = None, results = None, bandit = None, profiles = None, logger = None, pool = None, resident = 10000):
+        self.budget = budget
+        self.games = games
+        self.spent = 0
+        self.wins = resultStore(resident)
+        self.workers = workers
+        self.owned = pool is None and workers > 1
+        self.pool = multiprocessing.Pool(workers) if self.owned else pool
+        self.options = dict(engine = engine, race = race, seed = seed, cache = cache, results = results, bandit = bandit, profiles = profiles, logger = logger)
+
+    def exhausted(self) -> bool:
+        """Returns whether too little of the budget is left to score another deck."""
+        return self.budget - self.spent < self.games
+
+    def score(self, decks: list, against = []) -> list:
+        """Scores as many of `decks` as the budget allows and returns those of
+        them that have a score, in order.
+
+        When racing, the decks also race against the scored decks in `against`."""
+        new = [deck for deck in dict.fromkeys(decks) if deck not in self.wins]
+        new = new[:(self.budget - self.spent) // self.games]
+        contenders = [deck for deck in list(decks) + list(against) if deck in self.wins] + new
+        self.spent += scoreDecks(contenders, self.wins, self.games, pool = self.pool, workers = self.workers, **self.options)
+        return [deck for deck in decks if deck in self.wins]
+
+    def rate(self, deck: tuple) -> float:
+        """Returns the win rate of a scored deck."""
+        return winRate(self.wins[deck])
+
+    def best(self) -> tuple:
+        """Returns the scored deck with the best win rate."""
+        return self.wins.best()
+
+    def close(self) -> None:
+        if self.owned:
+            self.pool.close()
+        self.wins.close()
+
+def steepestAscent(ev: evaluator, start: tuple, options = deckOptions, rng = random) -> tuple:
+    """Scores every neighbour of the current deck and moves to the best of
+    them, until none beats it. This is the climb `testDecks` does."""
+    current = start
+    ev.score([current])
+    while not ev.exhausted():
+        scored = ev.score(nearbyDecks(current, options), [current])
+        best = max(scored, key = ev.rate)
+        if ev.rate(best) <= ev.rate(current):
+            break
+        current = best
+    return ev.best()
+
+def firstImprovement(ev: evaluator, start: tuple, options = deckOptions, rng = random) -> tuple:
+    """Scores the neighbours of the current deck in a random order and moves
+    to the first that beats it, until none does.
+
+    Far fewer decks are scored per step than by `steepestAscent`."""
+    current = start
+    ev.score([current])
+    while not ev.exhausted():
+        neighbours = nearbyDecks(current, options)[1:]
+        rng.shuffle(neighbours)
+        for deck in neighbours:
+            if ev.score([deck], [current]) and ev.rate(deck) > ev.rate(current):
+                current = deck
+                break
+        else:
+            break
+    return ev.best()
+
+def beamSearch(ev: evaluator, start: tuple, options = deckOptions, rng = random, width = 5) -> tuple:
+    """Keeps the `width` best decks found so far and scores all of their
+    neighbours each step, until the beam stops changing."""
+    beam = ev.score([start])
+    while not ev.exhausted():
+        frontier = list(beam)
+        for deck in beam:
+            frontier += nearbyDecks(deck, options)
+        scored = ev.score(frontier, beam)
+        new = sorted(dict.fromkeys(scored), key = ev.rate, reverse = True)[:width]
+        if set(new) == set(beam):
+            break
+        beam = new
+    return ev.best()
+
+def annealing(ev: evaluator, start: tuple, options = deckOptions, rng = random, temperature = 0.01, cooling = 0.995, coldest = 0.0001) -> tuple:
+    """Moves to a random neighbour whenever it is better, and when it is
+    worse by `gain` with chance `exp(gain / temperature)`. The temperature
+    falls by `cooling` each step, and the search ends once it is below `coldest`.
+
+    Temperatures are in win rate, so 0.01 makes a deck winning 1% less often
+    an even bet to move to at first."""
+    current = start
+    ev.score([current])
+    while not ev.exhausted() and temperature > coldest:
+        deck = rng.choice(nearbyDecks(current, options)[1:])
+        if ev.score([deck], [current]):
+            gain = ev.rate(deck) - ev.rate(current)
+            if gain >= 0 or rng.random() < math.exp(gain / temperature):
+                current = deck
+        temperature *= cooling
+    return ev.best()
+
+def crossover(a: tuple, b: tuple, rng = random) -> tuple:
+    """Returns a child of decks `a` and `b` that takes how many of each card
+    to run from one or the other, then trims or tops it back up to their size.
+
+    No card goes above the most either parent runs, so the child is as legal as they are."""
+    child = [x if rng.random() < 0.5 else y for x, y in zip(a, b)]
+    size = sum(a)
+    while sum(child) > size:
+        child[rng.choice([i for i in range(0, nCards) if child[i] > 0])] -= 1
+    while sum(child) < size:
+        child[rng.choice([i for i in range(0, nCards) if child[i] < max(a[i], b[i])])] += 1
+    return tuple(child)
+
+def genetic(ev: evaluator, start: tuple, options = deckOptions, rng = random, population = 20, elite = 4, mutation = 0.5) -> tuple:
+    """Breeds a population of decks. Each generation keeps the `elite` best,
+    and fills up with children of parents picked by tournament, a `mutation`
+    share of whom also swap one card. Ends once a generation brings no new decks.
+
+    The first generation is the start deck and random walks of up to three swaps from it."""
+    decks = [start]
+    while len(decks) < population:
+        deck = start
+        for _ in range(0, rng.randint(1, 3)):
+            deck = rng.choice(nearbyDecks(deck, options)[1:])
+        decks.append(deck)
+
+    scored = ev.score(decks)
+    while not ev.exhausted():
+        ranked = sorted(dict.fromkeys(scored), key = ev.rate, reverse = True)
+        pick = lambda: ranked[min(rng.randrange(len(ranked)), rng.randrange(len(ranked)))]
+        children = ranked[:elite]
+        while len(children) < population:
+            child = crossover(pick(), pick(), rng)
+            if rng.random() < mutation:
+                child = rng.choice(nearbyDecks(child, options)[1:])
+            children.append(child)
+        if all(child in ev.wins for child in children):
+            break
+        scored = ev.score(children)
+    return ev.best()
+
+strategies = {
+    "steepest": steepestAscent,
+    "first": firstImprovement,
+    "beam": beamSearch,
+    "anneal": annealing,
+    "genetic": genetic,
+}
@@ -0,0 +1,111 @@
+"""
+Shuffle blocks
+--------------
+
+Games get their randomness from an rng-like stream with the `shuffle`,
+`sample` and `random` methods of `random.Random`. Rather than seeding a
+`random.Random` for every game and shuffling a card at a time with it, a
+`shuffleBlock` makes the randomness for a whole block of games at once with
+numpy, and each game's `gameStream` hands out its row of it:
+
+- permutations of range(`size`), the orderings of rows of random keys, for
+  shuffling the library. A shuffle of n cards keeps the positions below n,
+  which orders them uniformly at random too, so one size serves any library.
+- uniform numbers, for `random` and for shuffling hands and picking samples,
+  which take a few of them each.
+
+Game k of a run is row k % `blockGames` of block k // `blockGames`, and a
+seeded block is drawn from `numpy.random.default_rng([seed, block])`, so any
+game's randomness can be reproduced from (seed, block, row) alone.
+"""
+
+import numpy
+
+# Games a block holds shuffles for
+blockGames = 100
+
+# Longest list shuffled card by card rather than by a permutation
+smallShuffle = 16
+
+class gameStream():
+    """The random stream of one game, handing out `perms`, permutations of
+    range(`size`), and `uniforms`, numbers in [0, 1).
+
+    Once they run out, or for lists longer than `size`, it draws from its own
+    numpy stream seeded by `key`, the (seed, block, row) of the game."""
+
+    __slots__ = ["perms", "uniforms", "size", "key", "rng"]
+
+    def __init__(self, perms: list, uniforms: list, size: int, key: tuple):
+        self.perms = perms
+        self.uniforms = uniforms
+        self.size = size
+        self.key = key
+        self.rng = None
+
+    def spare(self) -> numpy.random.Generator:
+        if self.rng is None:
+            self.rng = numpy.random.default_rng(None if self.key[0] is None else list(self.key))
+        return self.rng
+
+    def permutation(self, n: int) -> list:
+        """Returns range(`n`) in a random order."""
+        if n > self.size or len(self.perms) == 0:
+            return self.spare().permutation(n).tolist()
+        return [i for i in self.perms.pop() if i < n]
+
+    def random(self) -> float:
+        if len(self.uniforms) == 0:
+            return self.spare().random()
+        return self.uniforms.pop()
+
+    def shuffle(self, x: list) -> None:
+        """Shuffles `x` in place, by a permutation if it is long and card by card if not."""
+        n = len(x)
+        if n > smallShuffle:
+            x[:] = [x[i] for i in self.permutation(n)]
+            return
+        for i in range(n - 1, 0, -1):
+            j = int(self.random() * (i + 1))
+            x[i], x[j] = x[j], x[i]
+
+    def sample(self, population: list, k: int) -> list:
+        """Returns `k` cards of `population` picked at random, in a random order."""
+        pool = list(population)
+        n = len(pool)
+        for i in range(0, k):
+            j = i + int(self.random() * (n - i))
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[0:k]
+
+class shuffleBlock():
+    """Makes `shuffles` permutations of range(`size`) and `uniforms` uniform
+    numbers for each of the `rows` games of block number `block` of a run
+    seeded by `seed`, or from fresh entropy if `seed` is None."""
+
+    def __init__(self, seed, block: int, rows = blockGames, size = 64, shuffles = 2, uniforms = 32):
+        rng = numpy.random.default_rng(None if seed is None else [seed, block])
+        self.perms = rng.random((rows, shuffles, size)).argsort(axis = 2).tolist()
+        self.uniforms = rng.random((rows, uniforms)).tolist()
+        self.seed = seed
+        self.block = block
+        self.size = size
+
+    def game(self, row: int) -> gameStream:
+        """Returns a fresh stream of the game in `row`."""
+        return gameStream(list(self.perms[row]), list(self.uniforms[row]), self.size, (self.seed, self.block, row))
+
+class shuffleSource():
+    """Hands out the streams of the numbered games of a run seeded by `seed`,
+    making each block as its first game is asked for."""
+
+    def __init__(self, seed = None, size = 64):
+        self.seed = seed
+        self.size = size
+        self.block = None
+
+    def game(self, k: int) -> gameStream:
+        """Returns a fresh stream of game `k`."""
+        if self.block is None or self.block.block != k // blockGames:
+            self.block = shuffleBlock(self.seed, k // blockGames, size = self.size)
+        return self.block.game(k % blockGames)
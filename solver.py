@@ -0,0 +1,455 @@
+"""
+Combo solver
+------------
+
+`game.go` plays turn 4 in one fixed priority order, so a deck's win rate
+measures that order as much as the deck. `solveTurn` instead searches every
+line of play from the position `firstTurns` leaves, to find whether the game
+could have been won at all: which creature to delve out, tap or sacrifice,
+when to filter, dig or loot and what to keep, and when to cast knowledge or
+brainspoil.
+
+Moves are the card effects `go` plays by, with their real costs in place of
+its thresholds for when to play them. Mana that may be of any of several
+colours is left undecided until it is spent: the pool is what has been made
+and what has been paid, and a payment can be made while every set of colours
+asked for is covered by the mana that could be one of them. The library order
+is known, as it is to the game, and brainspoil shuffles with a copy of the
+game's own random stream.
+
+Positions reached by playing the same cards in a different order are searched
+once, through a table keyed on the zones' counts, the mana, the graveyard size
+and the library; storm is left out, as nothing the deck plays counts it.
+Plays that can never hurt are made without trying others, and looting
+discards lands that enter tapped before anything else. Each position's mana
+is bounded by counting every card it could dig to as making the most mana it
+can, less the least the digging could cost: lines whose bound falls short of
+21 are cut off, and the rest are tried highest bound first. A game whose
+search outgrows `nodes` positions is given up as unsolved, and counted as won
+or lost as `go` played it.
+
+A game takes the solver about a quarter of a second on average, and up to a
+second or two before the node cap gives up on it, so decks are scored by `go`
+and only a sample of their games is solved: `main.py --solved FILE` writes
+each deck's heuristic and could-have-won counts over its first
+`--solve-games` games beside its result.
+
+    python solver.py [GAMES]
+    python main.py --solved FILE [--solve-games GAMES] ...
+"""
+
+import random, sys
+
+from main import game, cardIndex, manaValues, default, deckCards, deckCounts, winMana, cloneRng, TAPPED_LAND
+from countgame import (countGame, nCards, indices, PETAL, RITUAL, WRAITH, KAERVEK,
+    ENERGYTAP, OFFERING, STAR, SPHERE, MANAMORPHOSE, KNOWLEDGE, BRAINSPOIL, PONDER,
+    PREORDAIN, VISIONS, LOOTING, ATTENDANTS, GURMANGLER, basicColours, sacLandMana, kindIndices)
+
+# The mana pool is kept as how much more could be paid of each set of colours
+# (U, B, R, UB, UR, BR, UBR) and in all, once what has been paid is taken from
+# what could pay it. Pools able to pay for the same things are then equal.
+colourSets = [{"U"}, {"B"}, {"R"}, {"U", "B"}, {"U", "R"}, {"B", "R"}, {"U", "B", "R"}]
+
+def poolMask(colours: set) -> tuple:
+    """Returns the slacks mana of any of `colours` (none for colourless) adds to."""
+    return tuple([1 if colours & s else 0 for s in colourSets] + [1])
+
+# Kinds of mana made, by the sets of colours they could be
+MW, MU, MB, MR, MG, MC, MUBR, MBR = [poolMask(c) for c in
+    [set(), {"U"}, {"B"}, {"R"}, set(), set(), {"U", "B", "R"}, {"B", "R"}]]
+emptyPool = (0,) * (len(colourSets) + 1)
+
+# The kind of mana each colour of `game.floating` (WUBRG colourless) is
+colourKinds = [MW, MU, MB, MR, MG, MC]
+
+# Positions searched a game before it is given up as unsolved
+defaultNodes = 5000
+
+# Creatures, by dense index, and their mana value, biggest first
+creatures = sorted([(cardIndex[card], manaValues[card]) for card in game.creatures
+                    if cardIndex[card] != WRAITH], key = lambda c: -c[1])
+
+# How many cards deep into the library each card can dig, drawing or seeing
+# past them, and the least mana it costs to, net of any it makes back
+digs = {WRAITH: (1, 0), MANAMORPHOSE: (1, 0), STAR: (1, 1), SPHERE: (1, 1), LOOTING: (2, 1),
+        PONDER: (3, 1), PREORDAIN: (3, 1), VISIONS: (3, 1), KNOWLEDGE: (creatures[0][1], 5)}
+
+# Cards that can do nothing on the combo turn, so are the first to discard
+deadCards = kindIndices[TAPPED_LAND]
+
+# Cards that need blue mana, and the most blue mana each card could make
+needsBlue = [PONDER, PREORDAIN, VISIONS, KNOWLEDGE, ENERGYTAP]
+blueMade = [0] * nCards
+for i, n in [(PETAL, 1), (STAR, 1), (SPHERE, 1), (MANAMORPHOSE, 2)] + [(i, 1) for i, colour in basicColours if colour == 1]:
+    blueMade[i] = n
+
+class searchExhausted(Exception):
+    """Raised when a search outgrows its node budget."""
+
+def pay(pool: tuple, u = 0, b = 0, r = 0, generic = 0):
+    """Returns `pool` after paying the given mana, or None if it cannot be paid.
+
+    It can be while each set of colours paid is covered by the mana that
+    could be one of them, and everything paid by the mana in all."""
+    paid = (pool[0] - u, pool[1] - b, pool[2] - r, pool[3] - u - b, pool[4] - u - r,
+            pool[5] - b - r, pool[6] - u - b - r, pool[7] - u - b - r - generic)
+    return paid if min(paid) >= 0 else None
+
+def make(pool: tuple, kind: tuple, n: int) -> tuple:
+    """Returns `pool` with `n` mana of `kind`, one of `MW` to `MBR`, made."""
+    return tuple([slack + n * adds for slack, adds in zip(pool, kind)])
+
+def spare(pool: tuple) -> int:
+    """Returns the mana left in `pool`."""
+    return pool[-1]
+
+def add(counts: tuple, i: int, n = 1) -> tuple:
+    """Returns the count vector `counts` with `n` more of card index `i`."""
+    counts = list(counts)
+    counts[i] += n
+    return tuple(counts)
+
+def scryings(library: tuple) -> set:
+    """Returns the libraries a scry 2 of `library`, kept top card last, can leave."""
+    rest, second, top = library[:-2], library[-2], library[-1]
+    return {library, rest + (top, second), (second,) + rest + (top,),
+            (top,) + rest + (second,), (second, top) + rest, (top, second) + rest}
+
+def turnState(t: countGame) -> tuple:
+    """Returns the position `go` starts from in `t`, a `countGame` after
+    `firstTurns`: its basics tapped and lands that enter tapped sacrificed.
+
+    A position is `(hand, field, tapped, graveyard, pool, library, stream)`
+    with the zones as count vectors and the library as dense indices, top card
+    last. `stream` is the random stream left by the line's last shuffle, or
+    None before its first."""
+    floating = list(t.floating)
+    field = list(t.battlefield)
+    tapped = list(t.tapped)
+    graveyard = t.graveyardSize
+    for i, colour in basicColours:
+        floating[colour] += field[i]
+        tapped[i] += field[i]
+        field[i] = 0
+    for i, mana in sacLandMana:
+        for colour, n in enumerate(mana):
+            floating[colour] += n * field[i]
+        graveyard += field[i]
+        field[i] = 0
+    pool = emptyPool
+    for kind, n in zip(colourKinds, floating):
+        pool = make(pool, kind, n)
+    return (tuple(t.hand), tuple(field), tuple(tapped), graveyard, pool,
+            tuple(indices(t.library)), None)
+
+def digDepth(diggers: list, blue: list, blues: int) -> int:
+    """Returns how deep `diggers` and no more than `blues` of the `blue`
+    diggers, each a `(depth, cost)`, could dig at most."""
+    return sum([deep for deep, _ in diggers]) + sum(sorted([deep for deep, _ in blue], reverse = True)[:max(0, blues)])
+
+def digCost(diggers: list, depth: int, blue: list, blues: int) -> float:
+    """Returns the least mana `diggers` and no more than `blues` of the
+    `blue` diggers, each a `(depth, cost)`, could dig `depth` cards for,
+    letting any of them be played in part, or None if they cannot dig that far.
+
+    Whichever blue diggers are played, they dig no deeper and cost no less
+    than the deepest of them at the cost of the cheapest."""
+    if blue and blues > 0:
+        cheapest = min([cost for _, cost in blue])
+        diggers = diggers + [(deep, cheapest) for deep, _ in sorted(blue, reverse = True)[:blues]]
+    cost = 0
+    for deep, price in sorted(diggers, key = lambda d: d[1] / d[0]):
+        if depth <= 0:
+            break
+        cost += price * min(1, depth / deep)
+        depth -= deep
+    return cost if depth <= 0 else None
+
+def manaGain(reach: list, field: tuple, tapped: tuple, blues: int) -> int:
+    """Returns the most mana the cards of `reach` and the permanents could
+    make, net of what they cost, casting no more than `blues` energytaps."""
+    # Each creature can be tapped by energytap and then sacrificed to
+    # offering, for its mana value less the card's one mana, and a creature
+    # still to be cast costs at least another one
+    onField = field[ATTENDANTS] + field[GURMANGLER]
+    onTapped = tapped[ATTENDANTS] + tapped[GURMANGLER]
+    toCast = reach[ATTENDANTS] + reach[GURMANGLER]
+    taps = min(reach[ENERGYTAP], onField + toCast, blues)
+    offers = min(reach[OFFERING], onField + onTapped + toCast)
+    cast = max(0, taps - onField, offers - onField - onTapped)
+    gain = reach[PETAL] + field[PETAL] + 2 * reach[RITUAL] + sum([reach[i] for i, _ in basicColours])
+    return gain + (creatures[0][1] - 1) * (taps + offers) - cast
+
+def manaBound(position: tuple, tutor = None) -> int:
+    """Returns an upper bound on the mana a line from `position` could end
+    with, or -1 if it could not reach kaervek.
+
+    Every card the line could dig to counts as making the most it can, less
+    the least the digging could cost. A brainspoil cast before digging is
+    bounded by the library `tutor(library, stream)` shuffles it into, and
+    one cast after as reaching the whole library."""
+    hand, field, tapped, graveyard, pool, library, stream = position
+    everything = list(hand)
+    for i in library:
+        everything[i] += 1
+    if not everything[KAERVEK]:
+        return -1
+
+    reach = list(hand)
+    blues = pool[0] + field[PETAL] + field[STAR] + field[SPHERE] + sum([blueMade[i] * hand[i] for i in range(0, nCards)])
+    diggers, blue = [], []
+    for i in digs:
+        (blue if i in needsBlue else diggers).extend([digs[i]] * hand[i])
+    diggers += [(1, 0)] * (field[STAR] + field[SPHERE])
+    best = -1
+    spoiled = False
+    for depth in range(0, len(library) + 1):
+        if depth:
+            i = library[-depth]
+            reach[i] += 1
+            blues += blueMade[i]
+            if i in digs:
+                (blue if i in needsBlue else diggers).append(digs[i])
+            if digDepth(diggers, blue, blues) < depth:
+                break
+        gains = []
+        if reach[BRAINSPOIL] and not spoiled and (depth or tutor is None):
+            spoiled = True
+            allBlues = blues + sum([blueMade[i] for i in library[:len(library) - depth]])
+            gains.append(spare(pool) + manaGain(everything, field, tapped, allBlues) - 3)
+        if reach[KAERVEK]:
+            gains.append(spare(pool) + manaGain(reach, field, tapped, blues))
+        if max(gains, default = -1) > best:
+            cost = digCost(diggers, depth, blue, blues)
+            best = max([best] + [gain - int(cost) for gain in gains])
+    if hand[BRAINSPOIL] and tutor is not None and KNOWLEDGE in library:
+        shuffled, shuffledStream = tutor(library, stream)
+        best = max(best, manaBound((add(add(hand, BRAINSPOIL, -1), KNOWLEDGE), field, tapped,
+                                    graveyard + 1, make(pool, MC, -3), shuffled, shuffledStream), tutor))
+    return best
+
+class turnSolver():
+    """Searches the lines of play from positions of one game, whose brainspoil
+    shuffles come from `rng`, giving up after `nodes` positions."""
+
+    def __init__(self, rng = random, nodes = defaultNodes):
+        self.rng = rng
+        self.nodes = nodes
+        self.searched = 0
+        self.table = {}
+        self.shuffles = {}
+        self.bounds = {}
+
+    def solve(self, position: tuple) -> bool:
+        """Returns whether the game can be won from `position`, trying the
+        moves whose positions have the highest mana bound first."""
+        won = self.table.get(position)
+        if won is None:
+            self.searched += 1
+            if self.searched > self.nodes:
+                raise searchExhausted()
+            won = False
+            if self.bound(position) >= winMana:
+                children = list(self.moves(position))
+                if True in children:
+                    won = True
+                else:
+                    children.sort(key = self.bound, reverse = True)
+                    won = any(self.solve(child) for child in children)
+            self.table[position] = won
+        return won
+
+    def bound(self, position: tuple) -> int:
+        """Returns `manaBound` of `position`, remembering it."""
+        bound = self.bounds.get(position)
+        if bound is None:
+            bound = self.bounds[position] = manaBound(position, self.tutorKnowledge)
+        return bound
+
+    def moves(self, position: tuple):
+        """Yields the positions one play from `position` leads to, or True for
+        a win, roughly most promising first."""
+        hand, field, tapped, graveyard, pool, library, stream = position
+
+        # Kaervek's touch to win the game
+        if hand[KAERVEK] and pay(pool, r = 1, generic = winMana - 1) is not None:
+            yield True
+            return
+
+        # Plays that never hurt are made at once, without trying anything else first
+        forced = self.forcedMove(position)
+        if forced is not None:
+            yield forced
+            return
+
+        # Delve for creature
+        for i, cmc in creatures:
+            if hand[i]:
+                delved = min(cmc - 1, graveyard)
+                paid = pay(pool, b = 1, generic = cmc - 1 - delved)
+                if paid is not None:
+                    yield (add(hand, i, -1), add(field, i), tapped, graveyard - delved, paid, library, stream)
+
+        # Make mana from creatures
+        if hand[ENERGYTAP]:
+            paid = pay(pool, u = 1)
+            creature = next((c for c in creatures if field[c[0]]), None)
+            if paid is not None and creature is not None:
+                i, cmc = creature
+                yield (add(hand, ENERGYTAP, -1), add(field, i, -1), add(tapped, i), graveyard + 1,
+                       make(paid, MC, cmc), library, stream)
+        if hand[OFFERING]:
+            paid = pay(pool, b = 1)
+            if paid is not None:
+                for i, cmc in creatures:
+                    if tapped[i]:
+                        yield (add(hand, OFFERING, -1), field, add(tapped, i, -1), graveyard + 2,
+                               make(paid, MBR, cmc), library, stream)
+                    elif field[i]:
+                        yield (add(hand, OFFERING, -1), add(field, i, -1), tapped, graveyard + 2,
+                               make(paid, MBR, cmc), library, stream)
+
+        # Filters to play
+        for i in [STAR, SPHERE]:
+            if hand[i]:
+                paid = pay(pool, generic = 1)
+                if paid is not None:
+                    yield (add(hand, i, -1), add(field, i), tapped, graveyard, paid, library, stream)
+
+        # Draw cards
+        cmc = max([cmc for i, cmc in creatures if field[i] or tapped[i]], default = 0)
+        if hand[KNOWLEDGE] and cmc and len(library) >= cmc:
+            paid = pay(pool, u = 1, generic = 4)
+            if paid is not None:
+                drawn = add(hand, KNOWLEDGE, -1)
+                for i in library[-cmc:]:
+                    drawn = add(drawn, i)
+                yield (drawn, field, tapped, graveyard + 1, paid, library[:-cmc], stream)
+        if hand[BRAINSPOIL] and KNOWLEDGE in library:
+            paid = pay(pool, b = 2, generic = 1)
+            if paid is not None:
+                shuffled, shuffledStream = self.tutorKnowledge(library, stream)
+                yield (add(add(hand, BRAINSPOIL, -1), KNOWLEDGE), field, tapped, graveyard + 1, paid, shuffled, shuffledStream)
+
+        # Dig for cards
+        for i, size in [(PONDER, 3), (PREORDAIN, 2), (VISIONS, 3)]:
+            if hand[i] and len(library) >= size:
+                paid = pay(pool, u = 1)
+                if paid is None:
+                    continue
+                after = add(hand, i, -1)
+                if i == VISIONS:
+                    after, library2 = add(after, library[-1]), library[:-1]
+                    for scried in scryings(library2):
+                        yield (after, field, tapped, graveyard + 1, paid, scried, stream)
+                else:
+                    for scried in scryings(library):
+                        yield (add(after, scried[-1]), field, tapped, graveyard + 1, paid, scried[:-1], stream)
+        if hand[LOOTING] and len(library) >= 2:
+            paid = pay(pool, r = 1)
+            if paid is not None:
+                drawn = add(add(add(hand, LOOTING, -1), library[-1]), library[-2])
+                for kept in discards(drawn, 2):
+                    yield (kept, field, tapped, graveyard + 1 + 2, paid, library[:-2], stream)
+
+    def forcedMove(self, position: tuple):
+        """Returns the position after a play that can never make a line worse,
+        if one can be made: one that only makes mana, turns mana into mana that
+        can pay for more, or draws a card for free. Otherwise returns None."""
+        hand, field, tapped, graveyard, pool, library, stream = position
+        if hand[PETAL]:
+            return (add(hand, PETAL, -1), field, tapped, graveyard + 1, make(pool, MUBR, 1), library, stream)
+        if field[PETAL]:
+            return (hand, add(field, PETAL, -1), tapped, graveyard + 1, make(pool, MUBR, 1), library, stream)
+        for i, colour in basicColours:
+            if hand[i]:
+                return (add(hand, i, -1), field, add(tapped, i), graveyard, make(pool, colourKinds[colour], 1), library, stream)
+        if hand[RITUAL]:
+            paid = pay(pool, b = 1)
+            if paid is not None:
+                return (add(hand, RITUAL, -1), field, tapped, graveyard + 1, make(paid, MB, 3), library, stream)
+        if library:
+            if hand[WRAITH]:
+                return (add(add(hand, WRAITH, -1), library[-1]), field, tapped, graveyard + 1, pool, library[:-1], stream)
+            for i in [STAR, SPHERE]:
+                if field[i]:
+                    paid = pay(pool, generic = 1)
+                    if paid is not None:
+                        return (add(hand, library[-1]), add(field, i, -1), tapped, graveyard + 1,
+                                make(paid, MUBR, 1), library[:-1], stream)
+            if hand[MANAMORPHOSE]:
+                paid = pay(pool, r = 1, generic = 1)
+                if paid is not None:
+                    return (add(add(hand, MANAMORPHOSE, -1), library[-1]), field, tapped, graveyard + 1,
+                            make(paid, MUBR, 2), library[:-1], stream)
+        return None
+
+    def tutorKnowledge(self, library: tuple, stream) -> tuple:
+        """Returns `library` without its topmost knowledge and shuffled as
+        `game.shuffleLibrary` would, by a copy of `stream` (the game's stream
+        if None), and the copy."""
+        key = (library, id(stream))
+        if key not in self.shuffles:
+            rest = list(library)
+            del rest[len(rest) - 1 - rest[::-1].index(KNOWLEDGE)]
+            rng = cloneRng(self.rng if stream is None else stream)
+            rest.reverse()
+            rng.shuffle(rest)
+            rest.reverse()
+            self.shuffles[key] = (tuple(rest), rng)
+        return self.shuffles[key]
+
+def discards(hand: tuple, n: int) -> list:
+    """Returns every hand left by discarding `n` cards of `hand`, or all of it
+    if it holds fewer. Cards that can do nothing are always discarded first."""
+    if n == 0 or sum(hand) == 0:
+        return [hand]
+    dead = next((i for i in deadCards if hand[i]), None)
+    if dead is not None:
+        return discards(add(hand, dead, -1), n - 1)
+    hands = set()
+    for i in range(0, nCards):
+        if hand[i]:
+            hands.update(discards(add(hand, i, -1), n - 1))
+    return list(hands)
+
+def solveTurn(t: countGame, nodes = defaultNodes):
+    """Returns whether `t`, a `countGame` after `firstTurns`, could still be
+    won, or None if the search outgrew `nodes` positions. `t` is left as it is."""
+    solver = turnSolver(t.rng, nodes)
+    try:
+        return solver.solve(turnState(t))
+    except searchExhausted:
+        return None
+
+def solveOutcomes(deck, games = 1000, seed = None, start = 0, nodes = defaultNodes) -> tuple:
+    """Plays `games` games of `deck`, a count vector, both by `go` and by the
+    solver, numbered and seeded as by `playOutcomes`, and returns how many
+    `(heuristic, solved, unsolved)`: won by `go`, found winnable by the
+    solver, and given up on. Games given up on count as solved if `go` won them."""
+    from shuffles import shuffleSource
+    cards = deckCards(deck)
+    source = shuffleSource(seed, max(64, len(cards)))
+    heuristic = solved = unsolved = 0
+    t = None
+    for k in range(0, games):
+        rng = source.game(start + k)
+        if t is None:
+            t = countGame(cards, rng = rng)
+        else:
+            t.reset(rng)
+        t.firstTurns()
+        won = solveTurn(t, nodes)
+        played = t.go()
+        if won is None:
+            unsolved += 1
+            won = played
+        heuristic += played
+        solved += bool(won)
+    return heuristic, solved, unsolved
+
+if __name__ == "__main__":
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    heuristic, solved, unsolved = solveOutcomes(deckCounts(default), games, seed = 1)
+    print(f"heuristic won {heuristic / games:.2%}, could have won {solved / games:.2%} "
+          f"of {games} games ({unsolved} unsolved)")
@@ -0,0 +1,173 @@
+"""
+Result store
+------------
+
+A search keeps the `(won, played)` result of every deck it scores, which a
+long run or a large option pool makes into more than memory can hold. A
+`resultStore` can be used wherever `scoreDecks` takes its `wins` dict, but
+holds at most `capacity` results in memory, keyed by the deck's card counts
+as bytes rather than as a tuple of ints. Past that, the results set least
+recently go to a SQLite file, and the `keep` best of those stay in a heap.
+
+Whether a deck was scored is a dict lookup, or a lookup in the file's index
+once results have gone to it. The results in memory are ranked in a heap as
+they are set, whose entries for results set again or moved to disk are only
+dropped once they reach the top, and the best result on disk is kept as it
+goes there, so the best deck is found in O(log n) without the file. Ties go
+to the deck scored first, as with `max` over a dict. Setting a result that
+is on disk again, as racing does, brings it back into memory.
+"""
+
+import heapq, itertools, sqlite3
+
+from main import winRate
+
+class resultStore():
+    """Maps decks, count vectors as from `deckCounts`, to their `(won, played)`
+    results, with at most `capacity` of them in memory. The rest go to a
+    SQLite file at `path`, or to a temporary one if None."""
+
+    def __init__(self, capacity = 10000, keep = 100, path = None):
+        self.capacity = capacity
+        self.keep = keep
+        self.path = path
+        # Deck bytes to (won, played, the order it was first set in, stamp)
+        self.recent = {}
+        # Min-heap of (-rate, order, stamp, deck bytes) of the results in
+        # memory, an entry only current while its stamp is the deck's
+        self.ranking = []
+        self.stamps = itertools.count()
+        # Min-heap of (rate, -order, deck bytes) of the best results on disk,
+        # and the best of them
+        self.heap = []
+        self.diskBest = None
+        self.db = None
+        self.count = 0
+
+    def find(self, key: bytes):
+        """Returns the `(won, played, order)` stored for the deck bytes `key`, or None."""
+        value = self.recent.get(key)
+        if value is None and self.db is not None:
+            value = self.db.execute("SELECT won, played, seq FROM results WHERE deck = ?", (key,)).fetchone()
+        return value
+
+    def __contains__(self, deck) -> bool:
+        return self.find(bytes(deck)) is not None
+
+    def __getitem__(self, deck) -> tuple:
+        value = self.find(bytes(deck))
+        if value is None:
+            raise KeyError(deck)
+        return value[0], value[1]
+
+    def get(self, deck, default = None):
+        value = self.find(bytes(deck))
+        return default if value is None else (value[0], value[1])
+
+    def __setitem__(self, deck, result: tuple) -> None:
+        key = bytes(deck)
+        old = self.recent.pop(key, None)
+        if old is None:
+            old = self.find(key)
+            if old is not None:
+                self.unspill(key)
+        if old is None:
+            old = (0, 0, self.count)
+            self.count += 1
+        stamp = next(self.stamps)
+        self.recent[key] = (result[0], result[1], old[2], stamp)
+        heapq.heappush(self.ranking, (-winRate(result), old[2], stamp, key))
+        if len(self.recent) > self.capacity:
+            self.spill()
+        if len(self.ranking) > 2 * self.capacity + 16:
+            self.ranking = [(-winRate(value[:2]), value[2], value[3], key) for key, value in self.recent.items()]
+            heapq.heapify(self.ranking)
+
+    def update(self, results) -> None:
+        for deck, result in results.items():
+            self[deck] = result
+
+    def __len__(self) -> int:
+        return self.count
+
+    def items(self):
+        """Yields every `(deck, result)`, those on disk first."""
+        if self.db is not None:
+            for key, won, played in self.db.execute("SELECT deck, won, played FROM results ORDER BY seq"):
+                yield tuple(key), (won, played)
+        for key, (won, played, _, _) in list(self.recent.items()):
+            yield tuple(key), (won, played)
+
+    def __iter__(self):
+        return (deck for deck, _ in self.items())
+
+    def spill(self) -> None:
+        """Moves the older half of the results in memory to disk, keeping the best of them in the heap."""
+        if self.db is None:
+            # An empty path makes a private file SQLite deletes once closed
+            self.db = sqlite3.connect(self.path or "")
+            self.db.execute("CREATE TABLE IF NOT EXISTS results (deck BLOB PRIMARY KEY, won INTEGER, played INTEGER, seq INTEGER, rate REAL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS ranking ON results (rate DESC, seq)")
+        keys = list(itertools.islice(self.recent, len(self.recent) - self.capacity // 2))
+        rows = [(key, *self.recent.pop(key)[:3]) for key in keys]
+        self.db.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?)", [row + (winRate(row[1:3]),) for row in rows])
+        self.db.commit()
+
+        for key, won, played, seq in rows:
+            item = (winRate((won, played)), -seq, key)
+            if len(self.heap) < self.keep:
+                heapq.heappush(self.heap, item)
+            elif item > self.heap[0]:
+                heapq.heapreplace(self.heap, item)
+            if self.diskBest is None or item > self.diskBest:
+                self.diskBest = item
+
+    def unspill(self, key: bytes) -> None:
+        """Takes the deck bytes `key` off disk, as it is about to be set again.
+
+        The heap always holds the best results on disk, so if the deck was
+        one of them it is filled again from the file's ranking."""
+        self.db.execute("DELETE FROM results WHERE deck = ?", (key,))
+        if any(item[2] == key for item in self.heap):
+            rows = self.db.execute("SELECT rate, seq, deck FROM results ORDER BY rate DESC, seq LIMIT ?", (self.keep,))
+            self.heap = [(rate, -seq, deck) for rate, seq, deck in rows]
+            heapq.heapify(self.heap)
+            self.diskBest = max(self.heap, default = None)
+
+    def current(self, entry: tuple) -> bool:
+        """Returns whether a `ranking` entry is for its deck's result as it is now in memory."""
+        value = self.recent.get(entry[3])
+        return value is not None and value[3] == entry[2]
+
+    def residentTop(self, k: int) -> list:
+        """Returns the `(rate, -order, deck bytes)` of up to the `k` best results
+        in memory, best first, dropping the entries above them that are not current."""
+        taken = []
+        while len(taken) < k and self.ranking:
+            entry = heapq.heappop(self.ranking)
+            if self.current(entry):
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(self.ranking, entry)
+        return [(-rate, -seq, key) for rate, seq, _, key in taken]
+
+    def top(self, k: int) -> list:
+        """Returns up to `k`, and no more than `keep`, of the decks with the best win rates, best first."""
+        k = min(k, self.keep)
+        return [tuple(key) for _, _, key in heapq.nlargest(k, self.residentTop(k) + self.heap)]
+
+    def best(self) -> tuple:
+        """Returns the deck with the best win rate."""
+        while self.ranking and not self.current(self.ranking[0]):
+            heapq.heappop(self.ranking)
+        candidates = [] if self.diskBest is None else [self.diskBest]
+        if self.ranking:
+            rate, seq, _, key = self.ranking[0]
+            candidates.append((-rate, -seq, key))
+        if len(candidates) == 0:
+            raise ValueError("no decks have been scored")
+        return tuple(max(candidates)[2])
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
@@ -0,0 +1,8 @@
+"""
+The simulator is a flat tree of modules run from its own directory, so the
+tests import them from the directory above this one.
+"""
+
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,59 @@
+"""
+A checkpoint saves a climb's frontier, results, work units and random state,
+and a run resumed from it takes them back rather than playing them again.
+"""
+
+import os, random
+
+from main import default, deckCounts, deckOptions, nearbyDecks, playDecks
+from countgame import countGame
+from checkpoint import checkpoint, loadCheckpoint
+
+decks = nearbyDecks(deckCounts(default), deckOptions)[:3]
+
+def test_checkpointRoundTrip(tmp_path):
+    path = str(tmp_path / "climb.pkl")
+    saved = checkpoint(path, every = 3600)
+    saved.begin(decks, 4)
+    saved.add(decks[0], 0, b"\x01\x00\x01")
+    saved.scored(decks[1], (7, 1000))
+    saved.scored(decks[2], (3, 1000))
+    random.seed(11)
+    saved.save()
+    expected = random.random()
+
+    random.seed(99)
+    resumed = loadCheckpoint(path)
+    assert random.random() == expected
+    assert resumed.variations == decks
+    assert resumed.left == 4
+    assert resumed.lookup(decks[0], 0, 3) == b"\x01\x00\x01"
+    assert list(resumed.scoredDecks()) == [(decks[1], (7, 1000)), (decks[2], (3, 1000))]
+    assert resumed.best == (decks[1], (7, 1000))
+
+def test_scoredDeckDropsItsUnits(tmp_path):
+    saved = checkpoint(str(tmp_path / "climb.pkl"), every = 3600)
+    saved.add(decks[0], 0, b"\x01")
+    saved.scored(decks[0], (1, 1))
+    assert saved.lookup(decks[0], 0, 1) is None
+
+def test_freshCheckpointStartsItsResultsAgain(tmp_path):
+    path = str(tmp_path / "climb.pkl")
+    checkpoint(path, every = 3600).scored(decks[0], (1, 1000))
+    assert os.path.getsize(path + ".results") > 0
+    assert list(checkpoint(path, every = 3600).scoredDecks()) == []
+
+def test_resumedUnitsAreNotPlayedAgain(tmp_path):
+    path = str(tmp_path / "climb.pkl")
+    saved = checkpoint(path, every = 3600)
+    saved.begin(decks, 1)
+    played = playDecks(decks, 200, countGame, seed = 1, checkpoint = saved)
+    saved.save()
+    assert played == playDecks(decks, 200, countGame, seed = 1)
+
+    # Outcomes no game could have played show the resumed run took them from the file
+    resumed = loadCheckpoint(path)
+    resumed.units[(decks[0], 0, 200)] = b"\x01" * 200
+    again = playDecks(decks, 200, countGame, seed = 1, checkpoint = resumed)
+    assert again[decks[0]] == b"\x01" * 200
+    assert again[decks[1]] == played[decks[1]]
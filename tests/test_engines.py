@@ -0,0 +1,30 @@
+"""
+Every engine plays the same rules: seeded, the list, count and give-up
+engines play identical games, and the batch engine, which has randomness
+of its own, wins at the same rate.
+"""
+
+from main import game, giveUpGame, default, deckCounts, deckOptions, nearbyDecks, playOutcomes, playGames
+from countgame import countGame, giveUpCountGame
+from batchgame import batchGame
+
+decks = [deckCounts(default)] + nearbyDecks(deckCounts(default), deckOptions)[:2]
+
+def test_seededEnginesPlayIdenticalGames():
+    for deck in decks:
+        expected = playOutcomes(deck, 1000, game, seed = 3)
+        for engine in [countGame, giveUpGame, giveUpCountGame]:
+            assert playOutcomes(deck, 1000, engine, seed = 3) == expected, engine.__name__
+
+def test_enginesPlayOnFromAnyStart():
+    deck = decks[0]
+    whole = playOutcomes(deck, 300, countGame, seed = 5)
+    assert playOutcomes(deck, 200, countGame, seed = 5, start = 100) == whole[100:]
+
+def test_batchWinRateMatchesCountEngine():
+    deck = decks[0]
+    batchGames, countGames = 40000, 10000
+    batch = playGames(deck, batchGames, batchGame, seed = 1) / batchGames
+    count = playGames(deck, countGames, countGame, seed = 1) / countGames
+    error = (batch * (1 - batch) / batchGames + count * (1 - count) / countGames) ** 0.5
+    assert abs(batch - count) < 4 * max(error, 1e-4)
@@ -0,0 +1,46 @@
+"""
+A fork of a `snapshot` taken with `replay` plays on exactly as the game it
+was taken from, and leaves that game as it was.
+"""
+
+from main import game, default, deckCards, playOutcomes, deckCounts
+from countgame import countGame
+from shuffles import shuffleSource
+
+zones = ["library", "hand", "graveyard", "battlefield", "tapped", "floating", "storm", "turn"]
+
+def position(t) -> dict:
+    return {name: list(getattr(t, name)) if type(getattr(t, name)) is list else getattr(t, name) for name in zones}
+
+def test_forkReplaysTheGame():
+    cards = deckCards(deckCounts(default))
+    for engine in [game, countGame]:
+        source = shuffleSource(2, 64)
+        for k in range(0, 200):
+            t = engine(cards, rng = source.game(k))
+            t.firstTurns()
+            snapshot = t.snapshot()
+            before = position(t)
+            fork = snapshot.fork()
+            assert position(fork) == before
+            assert fork.go() == t.go(), (engine.__name__, k)
+            assert position(fork) == position(t), (engine.__name__, k)
+
+def test_forksAreIndependent():
+    t = countGame(deckCards(deckCounts(default)), rng = shuffleSource(4, 64).game(0))
+    t.firstTurns()
+    snapshot = t.snapshot()
+    first, second = snapshot.fork(), snapshot.fork()
+    first.go()
+    assert position(second) == position(t)
+    assert second.go() == t.go()
+
+def test_seededGamesAreThoseOfPlayOutcomes():
+    deck = deckCounts(default)
+    source = shuffleSource(6, 64)
+    won = bytearray()
+    for k in range(0, 100):
+        t = game(deckCards(deck), rng = source.game(k))
+        t.firstTurns()
+        won.append(t.snapshot().fork().go())
+    assert bytes(won) == playOutcomes(deck, 100, game, seed = 6)
@@ -0,0 +1,43 @@
+"""
+A `resultStore` answers as the dict it stands in for, however many of its
+results have gone to disk.
+"""
+
+import random
+
+from main import bestDeck, winRate
+from store import resultStore
+
+def test_storeMatchesDict():
+    rng = random.Random(5)
+    for trial in range(0, 10):
+        keep = rng.choice([3, 20])
+        store = resultStore(capacity = rng.choice([4, 10, 50]), keep = keep)
+        wins = {}
+        decks = [tuple(rng.randrange(5) for _ in range(0, 25)) for _ in range(0, 200)]
+        for step in range(0, 1500):
+            deck = rng.choice(decks)
+            result = (rng.randrange(10), 10)
+            store[deck] = result
+            wins[deck] = result
+            if step % 97 == 0:
+                assert bestDeck(store) == bestDeck(wins), trial
+                ranked = sorted(wins, key = lambda deck: -winRate(wins[deck]))
+                assert store.top(keep) == ranked[:keep], trial
+            other = rng.choice(decks)
+            assert (other in store) == (other in wins)
+            assert store.get(other) == wins.get(other)
+        assert len(store) == len(wins)
+        assert dict(store.items()) == wins
+        assert set(store) == set(wins)
+        store.close()
+
+def test_storeRaisesForMissingDecks():
+    store = resultStore(capacity = 2)
+    store[(1, 2)] = (1, 10)
+    try:
+        store[(3, 4)]
+        assert False, "no KeyError"
+    except KeyError:
+        pass
+    assert store.get((3, 4), "none") == "none"